@@ -0,0 +1,88 @@
+import re
+import numpy as np
+from collections import deque
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+CHUNK_AGGREGATES = ("mean", "max", "multi")
+
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+def exceeds_window(text: str, window: int) -> bool:
+    # Stops scanning as soon as the window is exceeded, so very long texts are not fully tokenized
+    return next(islice(_WORD_PATTERN.finditer(text), window, None), None) is not None
+
+
+def iter_text_windows(text: str, window: int = 200, overlap: int = 50) -> Iterator[Tuple[str, int]]:
+    # Yield (chunk_text, n_tokens) for overlapping windows of whitespace tokens.
+    # Whitespace tokens are a cheap proxy for the model's word pieces; keep `window` comfortably
+    # below the model limit (256 word pieces for all-MiniLM-L6-v2).
+    # Only one window of tokens is held at a time, so memory stays flat for very long documents.
+    if window <= 0 or not 0 <= overlap < window:
+        raise ValueError(f"Invalid chunk window {window} / overlap {overlap}")
+
+    step = window - overlap
+    buffer = deque()
+    fresh = 0  # tokens added since the last yielded window
+
+    for match in _WORD_PATTERN.finditer(text):
+        buffer.append(match.group())
+        fresh += 1
+        if len(buffer) == window:
+            yield " ".join(buffer), window
+            for _ in range(step):
+                buffer.popleft()
+            fresh = 0
+
+    # Tail window, unless it would only repeat the overlap of the previous one
+    if fresh:
+        yield " ".join(buffer), len(buffer)
+
+
+def iter_batches(windows: Iterator[Tuple[str, int]], batch_size: int) -> Iterator[List[Tuple[str, int]]]:
+    while True:
+        batch = list(islice(windows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class ChunkAggregator:
+    # Streaming aggregation of chunk embeddings: token-weighted mean, element-wise max,
+    # or "multi" to keep every chunk vector (one row per chunk)
+
+    def __init__(self, dimension: int, aggregate: str = "mean", normalize: bool = True):
+        if aggregate not in CHUNK_AGGREGATES:
+            raise ValueError(f"Unknown chunk aggregate '{aggregate}', expected one of {CHUNK_AGGREGATES}")
+        self.aggregate = aggregate
+        self.normalize = normalize
+        self.chunks = 0
+        self._sum = np.zeros(dimension, dtype=np.float64)
+        self._weight = 0.0
+        self._max: Optional[np.ndarray] = None
+        self._rows: List[np.ndarray] = []
+
+    def add(self, embeddings: np.ndarray, weights: np.ndarray):
+        self.chunks += len(embeddings)
+        if self.aggregate == "mean":
+            self._sum += weights.astype(np.float64) @ embeddings
+            self._weight += float(weights.sum())
+        elif self.aggregate == "max":
+            batch_max = embeddings.max(axis=0)
+            self._max = batch_max if self._max is None else np.maximum(self._max, batch_max)
+        else:
+            self._rows.append(embeddings)
+
+    def result(self) -> np.ndarray:
+        if self.chunks == 0:
+            raise ValueError("No chunks were embedded")
+        if self.aggregate == "multi":
+            return np.ascontiguousarray(np.concatenate(self._rows, axis=0), dtype=np.float32)
+
+        vector = (self._sum / self._weight if self.aggregate == "mean" else self._max).astype(np.float32)
+        if self.normalize:
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector /= norm
+        return vector
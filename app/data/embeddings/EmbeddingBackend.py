@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+import asyncio
+from typing import List
+import numpy as np
+
+
+class EmbeddingBackend(ABC):
+    # Turns a batch of texts into a (len(texts), dimension) float32 matrix of sentence embeddings
+
+    name: str = "base"
+    dimension: int = 384
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        pass
+
+    def close(self):
+        pass
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        # Default for CPU-bound backends: run embed() on a worker thread so the event loop stays free
+        return await asyncio.to_thread(self.embed, texts)
@@ -0,0 +1,43 @@
+import threading
+from typing import Any, Dict, Type
+from .EmbeddingBackend import EmbeddingBackend
+from .backends.HFInferenceBackend import HFInferenceBackend
+from .backends.LocalBackend import LocalBackend
+from .backends.HashingBackend import HashingBackend
+
+
+class EmbeddingBackendFactory:
+
+    _backends: Dict[str, Type[EmbeddingBackend]] = {
+        "hf": HFInferenceBackend,
+        "local": LocalBackend,
+        "hashing": HashingBackend,
+    }
+
+    # Backends already built in this process, keyed by name and settings (model, path, pooling, ...)
+    _instances: Dict[str, EmbeddingBackend] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def register_backend(cls, backend_name: str, backend_class: Type[EmbeddingBackend]):
+        cls._backends[backend_name.lower()] = backend_class
+
+    @classmethod
+    def create_backend(cls, backend_name: str, **kwargs) -> EmbeddingBackend:
+        backend_name = backend_name.lower()
+
+        if backend_name not in cls._backends:
+            raise ValueError(f"Embedding backend '{backend_name}' is not registered. "
+                             f"Available backends: {list(cls._backends.keys())}")
+
+        return cls._backends[backend_name](**kwargs)
+
+    @classmethod
+    def shared_backend(cls, backend_name: str, **kwargs: Any) -> EmbeddingBackend:
+        # One backend per name and settings per process, so a local model is loaded (and its thread
+        # pool started) once rather than by every handler on every Streamlit rerun
+        key = repr((backend_name.lower(), sorted(kwargs.items())))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls.create_backend(backend_name, **kwargs)
+            return cls._instances[key]
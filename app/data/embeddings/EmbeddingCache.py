@@ -0,0 +1,212 @@
+import os
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class EmbeddingCache:
+    # Two-tier embedding cache keyed on (model_name, normalized text hash).
+    # Tier 1 is an in-process LRU, tier 2 is a SQLite file storing raw float32 bytes
+    # with size-based eviction of the least recently used rows.
+    # Handlers are rebuilt per pipeline / session / rerun, so they share one cache per cache_dir
+    # through shared() rather than each starting with an empty memory tier.
+
+    _instances: Dict[Optional[str], "EmbeddingCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 memory_items: int = 4096,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.logger = logging.getLogger(__name__)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            self._open_disk_tier()
+
+    @classmethod
+    def shared(cls, cache_dir: Optional[str] = None, **kwargs) -> "EmbeddingCache":
+        # One cache (memory tier + SQLite connection) per cache_dir per process; the first caller's
+        # size limits apply
+        key = os.path.abspath(cache_dir) if cache_dir else None
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(cache_dir=cache_dir, **kwargs)
+            return cls._instances[key]
+
+    def _open_disk_tier(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            db_path = os.path.join(self.cache_dir, "embeddings.sqlite3")
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, "
+                "vector BLOB NOT NULL, "
+                "nbytes INTEGER NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings (accessed_at)")
+            self._conn.commit()
+            row = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()
+            self._disk_bytes = int(row[0])
+            self.logger.info(f"Embedding disk cache opened at {db_path} ({self._disk_bytes} bytes)")
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to open embedding disk cache, using memory only: {e}")
+            self._conn = None
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        # Collapse whitespace so trivially different copies of the same text share a key
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, model_name: str, text: str) -> str:
+        digest = hashlib.sha256(cls.normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{model_name}:{digest}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        # Look up keys in memory first, then on disk. Disk hits are promoted to memory.
+        found = {}
+        with self._lock:
+            disk_lookup = []
+            for key in keys:
+                if key in found:
+                    continue
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.append(key)
+
+            if disk_lookup and self._conn is not None:
+                disk_found = self._read_disk(disk_lookup)
+                for key, vector in disk_found.items():
+                    self._remember(key, vector)
+                    found[key] = vector
+                self.disk_hits += len(disk_found)
+
+            self.misses += len(set(disk_lookup) - set(found))
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                # Copy so cached rows don't keep whole batch matrices alive
+                self._remember(key, np.array(vector, dtype=np.float32))
+            if self._conn is not None:
+                self._write_disk(items)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        try:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).copy()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Embedding disk cache read failed: {e}")
+        return found
+
+    def _write_disk(self, items: Dict[str, np.ndarray]):
+        try:
+            now = time.time()
+            rows = []
+            for key, vector in items.items():
+                blob = np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+                rows.append((key, blob, len(blob), now))
+            # Keep the size total incrementally: replaced rows give back their old bytes
+            replaced = self._stored_bytes(list(items))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, nbytes, accessed_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._disk_bytes += sum(nbytes for _, _, nbytes, _ in rows) - replaced
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+        except sqlite3.Error as e:
+            self.logger.error(f"Embedding disk cache write failed: {e}")
+
+    def _stored_bytes(self, keys: List[str]) -> int:
+        total = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            row = self._conn.execute(
+                f"SELECT COALESCE(SUM(nbytes), 0) FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchone()
+            total += int(row[0])
+        return total
+
+    def _evict_disk(self):
+        # Drop least recently used rows until the tier is back under 90% of its budget
+        target = int(self.max_disk_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, nbytes FROM embeddings ORDER BY accessed_at ASC").fetchall()
+        evict = []
+        for key, nbytes in rows:
+            if self._disk_bytes <= target:
+                break
+            evict.append((key,))
+            self._disk_bytes -= nbytes
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evict)
+        self._conn.commit()
+        self.logger.info(f"Evicted {len(evict)} embeddings from disk cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": self.memory_hits + self.disk_hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+                self._disk_bytes = 0
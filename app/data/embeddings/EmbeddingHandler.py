@@ -1,28 +1,50 @@
 import os
 import streamlit as st
 import numpy as np
-from huggingface_hub import InferenceClient
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import weakref
+import asyncio
 import time
 import logging
 
+from .EmbeddingCache import EmbeddingCache
+from .EmbeddingBackendFactory import EmbeddingBackendFactory
+from .SingleFlight import SingleFlight
+from .Chunking import ChunkAggregator, exceeds_window, iter_batches, iter_text_windows
+from services.RateLimitController import AdaptiveRateController
+
 class EmbeddingHandler:
     
+    # Shared by every handler in the process (one per Streamlit session) so that
+    # concurrent requests for the same text wait on a single backend call
+    _flight = SingleFlight()
+    _flight_timeout = 300.0
+    
+    # Sections embedded separately for fielded matching (stored as Qdrant named vectors)
+    SECTIONS = ("skills", "experience", "summary")
+    
     def __init__(self, 
                  model_name: Optional[str] = None,
                  api_token: Optional[str] = None,
                  max_retries: int = 3,
-                 retry_delay: float = 1.0):
+                 retry_delay: float = 1.0,
+                 backend: Optional[str] = None,
+                 dimension: int = 384):
 
         # Get environment variables or use defaults
         model_name = (
-            os.getenv("HF_MODEL") 
+            model_name
+            or os.getenv("HF_MODEL") 
             or st.secrets.get("HF_MODEL") 
             or "sentence-transformers/all-MiniLM-L6-v2"
         )
 
         api_token = (
-            os.getenv("HF_API_KEY") 
+            api_token
+            or os.getenv("HF_API_KEY") 
             or st.secrets.get("HF_API_KEY")
         )
 
@@ -30,66 +52,369 @@ class EmbeddingHandler:
         self.api_token = api_token
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        
-        # Initialize HuggingFace Hub client
-        self.client = InferenceClient(api_key=self.api_token)
+        self.dimension = dimension
         
         # Set up logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-        self.logger.warning(f"EmbeddingHandler initialized with model: {self.model_name}")
+        # Token pooling for backends that return token-level outputs ("mean", "cls" or "max")
+        self.pooling = os.getenv("EMBEDDING_POOLING") or st.secrets.get("EMBEDDING_POOLING") or "mean"
+        self.normalize = str(os.getenv("EMBEDDING_NORMALIZE") or st.secrets.get("EMBEDDING_NORMALIZE") or "true").lower() == "true"
+        
+        # Select embedding backend: "hf" (Inference API), "local" (in-process CPU) or "hashing" (offline)
+        backend_name = (
+            backend
+            or os.getenv("EMBEDDING_BACKEND")
+            or st.secrets.get("EMBEDDING_BACKEND")
+            or "hf"
+        )
+        self.backend = EmbeddingBackendFactory.shared_backend(
+            backend_name,
+            model_name=self.model_name,
+            api_token=self.api_token,
+            model_path=os.getenv("EMBEDDING_MODEL_PATH") or st.secrets.get("EMBEDDING_MODEL_PATH"),
+            batch_size=int(os.getenv("EMBEDDING_LOCAL_BATCH_SIZE") or st.secrets.get("EMBEDDING_LOCAL_BATCH_SIZE") or 32),
+            max_workers=int(os.getenv("EMBEDDING_LOCAL_WORKERS") or st.secrets.get("EMBEDDING_LOCAL_WORKERS") or 2),
+            dimension=self.dimension,
+            pooling=self.pooling,
+            normalize=self.normalize
+        )
+        # Vectors from different backends, pooling strategies or normalization settings are not
+        # interchangeable, so they get separate cache keys
+        self.cache_namespace = f"{self.backend.name}/{self.model_name}/{self.pooling}/{'norm' if self.normalize else 'raw'}"
+        
+        # Content-addressed embedding cache (in-process LRU + optional SQLite tier), shared process-wide
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR") or st.secrets.get("EMBEDDING_CACHE_DIR") or ".cache/embeddings"
+        memory_items = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS") or st.secrets.get("EMBEDDING_CACHE_MEMORY_ITEMS") or 4096)
+        max_disk_mb = int(os.getenv("EMBEDDING_CACHE_MAX_MB") or st.secrets.get("EMBEDDING_CACHE_MAX_MB") or 512)
+        self.cache = EmbeddingCache.shared(
+            cache_dir=cache_dir if cache_dir.lower() != "none" else None,
+            memory_items=memory_items,
+            max_disk_bytes=max_disk_mb * 1024 * 1024
+        )
+        
+        # Sliding-window chunking for texts longer than the model's token limit.
+        # EMBEDDING_CHUNK_AGGREGATE ("mean" or "max") applies to job/resume embeddings;
+        # multi-vector output is available through get_chunked_embedding(aggregate="multi").
+        self.chunking = str(os.getenv("EMBEDDING_CHUNKING") or st.secrets.get("EMBEDDING_CHUNKING") or "false").lower() == "true"
+        self.chunk_tokens = int(os.getenv("EMBEDDING_CHUNK_TOKENS") or st.secrets.get("EMBEDDING_CHUNK_TOKENS") or 200)
+        self.chunk_overlap = int(os.getenv("EMBEDDING_CHUNK_OVERLAP") or st.secrets.get("EMBEDDING_CHUNK_OVERLAP") or 50)
+        self.chunk_aggregate = os.getenv("EMBEDDING_CHUNK_AGGREGATE") or st.secrets.get("EMBEDDING_CHUNK_AGGREGATE") or "mean"
+        if self.chunk_aggregate not in ("mean", "max"):
+            raise ValueError(f"EMBEDDING_CHUNK_AGGREGATE must be 'mean' or 'max', got '{self.chunk_aggregate}'")
+        
+        # Sub-batching: cap texts per backend request and the number of requests in flight
+        self.max_batch_size = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE") or st.secrets.get("EMBEDDING_MAX_BATCH_SIZE") or 64)
+        self.max_in_flight = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT") or st.secrets.get("EMBEDDING_MAX_IN_FLIGHT") or 4)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="embed-batch")
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        
+        # Process-wide AIMD controller for this backend; backs off on 429/503 and honours Retry-After
+        self.rate_controller = AdaptiveRateController.for_provider(
+            f"embeddings:{self.backend.name}",
+            initial_limit=self.max_in_flight,
+            max_limit=int(os.getenv("EMBEDDING_MAX_CONCURRENCY") or st.secrets.get("EMBEDDING_MAX_CONCURRENCY") or 16),
+            base_delay=self.retry_delay
+        )
+        
+        # Throughput stats
+        self._stats_lock = threading.Lock()
+        self._texts_embedded = 0
+        self._batches_completed = 0
+        self._batch_retries = 0
+        self._busy_seconds = 0.0
+        self._batch_latencies = deque(maxlen=256)
+        
+        self.logger.warning(f"EmbeddingHandler initialized with model: {self.model_name} (backend: {self.backend.name})")
+    
+    def _split_cached(self, texts: List[str]):
+        keys = [EmbeddingCache.make_key(self.cache_namespace, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        
+        # Only texts that missed both tiers go to the API (deduplicated by key)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        return keys, cached, missing
+    
+    def _assemble(self, keys: List[str], cached: Dict[str, np.ndarray], missing: Dict[str, str]) -> np.ndarray:
+        self.logger.info(f"Embedding cache: {len(keys) - len(missing)} hits, {len(missing)} misses")
+        embeddings = np.empty((len(keys), self.dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            embeddings[row] = cached[key]
+        return embeddings
     
-    def _get_sentence_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Get sentence embeddings by mean pooling token embeddings."""
+    def _get_sentence_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Get a (len(texts), dim) float32 matrix of sentence embeddings, serving repeated texts from the cache."""
         self.logger.info(f"Getting embeddings for {len(texts)} texts")
+        keys, cached, missing = self._split_cached(texts)
+        
+        if missing:
+            owned, waiting = self._flight.claim(missing.keys())
+            if waiting:
+                self.logger.info(f"Coalescing {len(waiting)} texts with in-flight requests")
+            
+            if owned:
+                try:
+                    fetched = self._fetch_sentence_embeddings([missing[key] for key in owned])
+                    new_items = dict(zip(owned, fetched))
+                    self.cache.put_many(new_items)
+                    cached.update(new_items)
+                    self._flight.resolve(new_items)
+                except BaseException as e:
+                    self._flight.fail(owned, e)
+                    raise
+            
+            for key, call in waiting.items():
+                cached[key] = call.wait(self._flight_timeout)
         
+        return self._assemble(keys, cached, missing)
+    
+    async def _aget_sentence_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Async counterpart of _get_sentence_embeddings; never blocks the event loop on network or backoff."""
+        self.logger.info(f"Getting embeddings for {len(texts)} texts (async)")
+        keys, cached, missing = self._split_cached(texts)
+        
+        if missing:
+            owned, waiting = self._flight.claim(missing.keys())
+            if waiting:
+                self.logger.info(f"Coalescing {len(waiting)} texts with in-flight requests")
+            
+            if owned:
+                try:
+                    fetched = await self._afetch_sentence_embeddings([missing[key] for key in owned])
+                    new_items = dict(zip(owned, fetched))
+                    self.cache.put_many(new_items)
+                    cached.update(new_items)
+                    self._flight.resolve(new_items)
+                except BaseException as e:
+                    self._flight.fail(owned, e)
+                    raise
+            
+            # The owner may be a sync caller on another thread, so wait off the loop
+            for key, call in waiting.items():
+                cached[key] = await asyncio.to_thread(call.wait, self._flight_timeout)
+        
+        return self._assemble(keys, cached, missing)
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        return self.cache.stats()
+    
+    def get_single_flight_stats(self) -> Dict[str, int]:
+        return self._flight.stats()
+    
+    def _fetch_sentence_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Get sentence embeddings from the configured backend in concurrent sub-batches."""
+        self.logger.info(f"Requesting embeddings for {len(texts)} texts from {self.backend.name} backend")
+        started = time.perf_counter()
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        spans = [(start, min(start + self.max_batch_size, len(texts))) for start in range(0, len(texts), self.max_batch_size)]
+        
+        if len(spans) == 1:
+            embeddings[:] = self._fetch_batch(texts)
+        else:
+            # Each sub-batch retries on its own, so a failure never re-sends batches that already succeeded
+            futures = {self._executor.submit(self._fetch_batch, texts[start:end]): (start, end) for start, end in spans}
+            for future in as_completed(futures):
+                start, end = futures[future]
+                embeddings[start:end] = future.result()
+        
+        with self._stats_lock:
+            self._texts_embedded += len(texts)
+            self._busy_seconds += time.perf_counter() - started
+        
+        self.logger.info(f"Successfully got embeddings: {embeddings.shape[0]} embeddings in {len(spans)} batches, each with {embeddings.shape[1]} dimensions")
+        return embeddings
+    
+    def _fetch_batch(self, texts: List[str]) -> np.ndarray:
         for attempt in range(self.max_retries):
             try:
-                # Get token-level embeddings
-                outputs = self.client.feature_extraction(texts, model=self.model_name)
-                arr = np.array(outputs)  # shape: (batch, tokens, dim) or (tokens, dim) for single
+                with self.rate_controller.slot():
+                    started = time.perf_counter()
+                    embeddings = self.backend.embed(texts)
                 
-                # Ensure batch dimension
-                if arr.ndim == 2:  # single text: (tokens, dim)
-                    arr = arr[np.newaxis, ...]  # -> (1, tokens, dim)
+                if embeddings.shape != (len(texts), self.dimension):
+                    raise ValueError(f"Backend returned shape {embeddings.shape}, expected {(len(texts), self.dimension)}")
                 
-                # Mean pool over tokens axis
-                sentence_embeddings = arr.mean(axis=1)  # -> (batch, dim)
+                self.rate_controller.on_success()
+                with self._stats_lock:
+                    self._batches_completed += 1
+                    self._batch_latencies.append(time.perf_counter() - started)
+                return embeddings
+                
+            except Exception as e:
+                self.logger.error(f"Batch of {len(texts)} texts, attempt {attempt + 1} failed: {e}")
+                self.rate_controller.on_error(e)
+                if attempt < self.max_retries - 1:
+                    with self._stats_lock:
+                        self._batch_retries += 1
+                    delay = self.rate_controller.backoff_delay(attempt, e)
+                    self.logger.warning(f"Retrying in {delay:.2f} seconds...")
+                    time.sleep(delay)
+                    continue
+                else:
+                    raise Exception(f"Failed to get embeddings after {self.max_retries} attempts: {e}")
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop caps in-flight requests at EMBEDDING_MAX_IN_FLIGHT across all
+        # concurrent async calls, like the sync thread pool; the shared rate controller adapts below it
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._async_semaphores[loop] = semaphore
+        return semaphore
+    
+    async def _afetch_sentence_embeddings(self, texts: List[str]) -> np.ndarray:
+        self.logger.info(f"Requesting embeddings for {len(texts)} texts from {self.backend.name} backend (async)")
+        started = time.perf_counter()
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        spans = [(start, min(start + self.max_batch_size, len(texts))) for start in range(0, len(texts), self.max_batch_size)]
+        
+        semaphore = self._get_async_semaphore()
+        results = await asyncio.gather(*(self._afetch_batch(texts[start:end], semaphore) for start, end in spans))
+        for (start, end), batch in zip(spans, results):
+            embeddings[start:end] = batch
+        
+        with self._stats_lock:
+            self._texts_embedded += len(texts)
+            self._busy_seconds += time.perf_counter() - started
+        
+        self.logger.info(f"Successfully got embeddings: {embeddings.shape[0]} embeddings in {len(spans)} batches, each with {embeddings.shape[1]} dimensions")
+        return embeddings
+    
+    async def _afetch_batch(self, texts: List[str], semaphore: asyncio.Semaphore) -> np.ndarray:
+        for attempt in range(self.max_retries):
+            try:
+                # Hold a concurrency slot only while the request is in flight, not during backoff
+                async with semaphore, self.rate_controller.aslot():
+                    started = time.perf_counter()
+                    embeddings = await self.backend.aembed(texts)
                 
-                # Convert to list of lists
-                embeddings = sentence_embeddings.tolist()
+                if embeddings.shape != (len(texts), self.dimension):
+                    raise ValueError(f"Backend returned shape {embeddings.shape}, expected {(len(texts), self.dimension)}")
                 
-                self.logger.info(f"Successfully got embeddings: {len(embeddings)} embeddings, each with {len(embeddings[0])} dimensions")
+                self.rate_controller.on_success()
+                with self._stats_lock:
+                    self._batches_completed += 1
+                    self._batch_latencies.append(time.perf_counter() - started)
                 return embeddings
                 
             except Exception as e:
-                self.logger.error(f"Attempt {attempt + 1} failed: {e}")
+                self.logger.error(f"Batch of {len(texts)} texts, attempt {attempt + 1} failed: {e}")
+                self.rate_controller.on_error(e)
                 if attempt < self.max_retries - 1:
-                    self.logger.warning(f"Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
+                    with self._stats_lock:
+                        self._batch_retries += 1
+                    delay = self.rate_controller.backoff_delay(attempt, e)
+                    self.logger.warning(f"Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
                     continue
                 else:
                     raise Exception(f"Failed to get embeddings after {self.max_retries} attempts: {e}")
     
-    def get_embeddings(self, texts: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+    def get_throughput_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            latencies = np.array(self._batch_latencies, dtype=np.float64)
+            return {
+                "texts_embedded": self._texts_embedded,
+                "batches_completed": self._batches_completed,
+                "batch_retries": self._batch_retries,
+                "texts_per_sec": self._texts_embedded / self._busy_seconds if self._busy_seconds else 0.0,
+                "batch_latency_avg": float(latencies.mean()) if latencies.size else 0.0,
+                "batch_latency_p50": float(np.percentile(latencies, 50)) if latencies.size else 0.0,
+                "batch_latency_p95": float(np.percentile(latencies, 95)) if latencies.size else 0.0,
+                "rate_controller": self.rate_controller.stats(),
+            }
+    
+    def _should_chunk(self, text: str) -> bool:
+        return self.chunking and exceeds_window(text, self.chunk_tokens)
+    
+    def get_chunked_embedding(self, text: str, aggregate: Optional[str] = None) -> np.ndarray:
+        """Embed a long text as overlapping token windows and aggregate them.
+        
+        Returns one float32 vector for "mean"/"max", or a (n_chunks, dim) matrix for "multi".
+        Windows are generated lazily and embedded max_batch_size at a time.
+        """
+        aggregator = ChunkAggregator(self.dimension, aggregate or self.chunk_aggregate, self.normalize)
+        windows = iter_text_windows(text, self.chunk_tokens, self.chunk_overlap)
+        for batch in iter_batches(windows, self.max_batch_size):
+            chunk_texts = [chunk for chunk, _ in batch]
+            weights = np.array([n_tokens for _, n_tokens in batch], dtype=np.float32)
+            aggregator.add(self._get_sentence_embeddings(chunk_texts), weights)
+        
+        self.logger.info(f"Embedded long text as {aggregator.chunks} chunks ({aggregator.aggregate})")
+        return aggregator.result()
+    
+    async def aget_chunked_embedding(self, text: str, aggregate: Optional[str] = None) -> np.ndarray:
+        aggregator = ChunkAggregator(self.dimension, aggregate or self.chunk_aggregate, self.normalize)
+        windows = iter_text_windows(text, self.chunk_tokens, self.chunk_overlap)
+        for batch in iter_batches(windows, self.max_batch_size):
+            chunk_texts = [chunk for chunk, _ in batch]
+            weights = np.array([n_tokens for _, n_tokens in batch], dtype=np.float32)
+            aggregator.add(await self._aget_sentence_embeddings(chunk_texts), weights)
+        
+        self.logger.info(f"Embedded long text as {aggregator.chunks} chunks ({aggregator.aggregate})")
+        return aggregator.result()
+    
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        # Short texts go out as one batch; long texts (when chunking is enabled) are chunked individually
+        long_rows = [row for row, text in enumerate(texts) if self._should_chunk(text)]
+        if not long_rows:
+            return self._get_sentence_embeddings(texts)
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        long_set = set(long_rows)
+        short_rows = [row for row in range(len(texts)) if row not in long_set]
+        if short_rows:
+            embeddings[short_rows] = self._get_sentence_embeddings([texts[row] for row in short_rows])
+        for row in long_rows:
+            embeddings[row] = self.get_chunked_embedding(texts[row])
+        return embeddings
+    
+    async def _aembed_documents(self, texts: List[str]) -> np.ndarray:
+        long_rows = [row for row, text in enumerate(texts) if self._should_chunk(text)]
+        if not long_rows:
+            return await self._aget_sentence_embeddings(texts)
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        long_set = set(long_rows)
+        short_rows = [row for row in range(len(texts)) if row not in long_set]
+        if short_rows:
+            embeddings[short_rows] = await self._aget_sentence_embeddings([texts[row] for row in short_rows])
+        chunked = await asyncio.gather(*(self.aget_chunked_embedding(texts[row]) for row in long_rows))
+        for row, vector in zip(long_rows, chunked):
+            embeddings[row] = vector
+        return embeddings
+    
+    def _prepare_texts(self, texts: Union[str, List[str]]):
+        # Handle single string input
+        if isinstance(texts, str):
+            texts = [texts]
+            return_single = True
+        else:
+            return_single = False
+        
+        # Validate input
+        if not texts or len(texts) == 0:
+            raise ValueError("Input texts cannot be empty")
+        
+        # Filter out empty strings
+        texts = [text for text in texts if text and text.strip()]
+        if not texts:
+            raise ValueError("No valid non-empty texts provided")
+        
+        return texts, return_single
+    
+    def get_embeddings(self, texts: Union[str, List[str]]) -> np.ndarray:
         #Get embeddings for text(s). Can handle single string or list of strings.
+        #Returns a float32 vector for a single string, or a (n, dim) float32 matrix for a list.
         try:
-            # Handle single string input
-            if isinstance(texts, str):
-                texts = [texts]
-                return_single = True
-            else:
-                return_single = False
-            
-            # Validate input
-            if not texts or len(texts) == 0:
-                raise ValueError("Input texts cannot be empty")
-            
-            # Filter out empty strings
-            texts = [text for text in texts if text and text.strip()]
-            if not texts:
-                raise ValueError("No valid non-empty texts provided")
+            texts, return_single = self._prepare_texts(texts)
             
             # Make API request
             embeddings = self._get_sentence_embeddings(texts)
@@ -104,81 +429,96 @@ class EmbeddingHandler:
             self.logger.error(f"Error getting embeddings: {e}")
             raise e
     
-    def get_job_embeddings(self, jobs: List[dict]) -> List[List[float]]:
+    async def aget_embeddings(self, texts: Union[str, List[str]]) -> np.ndarray:
+        try:
+            texts, return_single = self._prepare_texts(texts)
+            embeddings = await self._aget_sentence_embeddings(texts)
+            return embeddings[0] if return_single else embeddings
+            
+        except Exception as e:
+            self.logger.error(f"Error getting embeddings: {e}")
+            raise e
+    
+    def _build_job_text(self, job: dict) -> str:
+        text_parts = []
+        if job.get("job_title"):
+            text_parts.append(f"Title: {job['job_title']}")
+            
+        if job.get("job_domain"):
+            text_parts.append(f"Domain: {job['job_domain']}")
+            
+        if job.get("summary"):
+            text_parts.append(f"Summary: {job['summary']}")
+            
+        if job.get("responsibilities"):
+            if isinstance(job["responsibilities"], list):
+                resp_text = "; ".join(job["responsibilities"])
+            else:
+                resp_text = str(job["responsibilities"])
+            text_parts.append(f"Responsibilities: {resp_text}")
+            
+        if job.get("required_skills"):
+            if isinstance(job["required_skills"], list):
+                skills_text = ", ".join(job["required_skills"])
+            else:
+                skills_text = str(job["required_skills"])
+            text_parts.append(f"Required Skills: {skills_text}")
+            
+        if job.get("qualifications"):
+            if isinstance(job["qualifications"], list):
+                qual_text = "; ".join(job["qualifications"])
+            else:
+                qual_text = str(job["qualifications"])
+            text_parts.append(f"Qualifications: {qual_text}")
+            
+        if job.get("experience_level"):
+            text_parts.append(f"Experience Level: {job['experience_level']}")
+        
+        if job.get("company"):
+            text_parts.append(f"Company: {job['company']}")
+            
+        if job.get("location"):
+            text_parts.append(f"Location: {job['location']}")
+            
+        if job.get("employment_type"):
+            text_parts.append(f"Employment Type: {job['employment_type']}")
+            
+        return "\n".join(text_parts)
+    
+    def _prepare_job_texts(self, jobs: List[dict]) -> List[str]:
+        self.logger.info(f"Getting embeddings for {len(jobs)} jobs")
+        
+        job_texts = []
+        for i, job in enumerate(jobs):
+            self.logger.info(f"Processing job {i+1}/{len(jobs)}: {job.get('job_title', 'No title')}")
+            
+            full_text = self._build_job_text(job)
+            
+            # Skip if no meaningful text was generated
+            if not full_text.strip():
+                self.logger.warning(f"Job {i+1} has no meaningful text content, skipping")
+                continue
+            
+            self.logger.info(f"Job {i+1} text length: {len(full_text)} characters")
+            self.logger.debug(f"Job {i+1} text preview: {full_text[:200]}...")
+            
+            job_texts.append(full_text)
+            
+        if not job_texts:
+            raise Exception("No valid jobs with meaningful text content found")
+        
+        return job_texts
+    
+    def get_job_embeddings(self, jobs: List[dict]) -> np.ndarray:
         
         # Get embeddings for job descriptions.
         # Creates one embedding per job using title, description, and required skills.
         
         try:
-            self.logger.info(f"Getting embeddings for {len(jobs)} jobs")
-            
-            job_texts = []
-            valid_jobs = []
-            
-            for i, job in enumerate(jobs):
-                self.logger.info(f"Processing job {i+1}/{len(jobs)}: {job.get('job_title', 'No title')}")
-                
-                text_parts = []
-                if job.get("job_title"):
-                    text_parts.append(f"Title: {job['job_title']}")
-                    
-                if job.get("job_domain"):
-                    text_parts.append(f"Domain: {job['job_domain']}")
-                    
-                if job.get("summary"):
-                    text_parts.append(f"Summary: {job['summary']}")
-                    
-                if job.get("responsibilities"):
-                    if isinstance(job["responsibilities"], list):
-                        resp_text = "; ".join(job["responsibilities"])
-                    else:
-                        resp_text = str(job["responsibilities"])
-                    text_parts.append(f"Responsibilities: {resp_text}")
-                    
-                if job.get("required_skills"):
-                    if isinstance(job["required_skills"], list):
-                        skills_text = ", ".join(job["required_skills"])
-                    else:
-                        skills_text = str(job["required_skills"])
-                    text_parts.append(f"Required Skills: {skills_text}")
-                    
-                if job.get("qualifications"):
-                    if isinstance(job["qualifications"], list):
-                        qual_text = "; ".join(job["qualifications"])
-                    else:
-                        qual_text = str(job["qualifications"])
-                    text_parts.append(f"Qualifications: {qual_text}")
-                    
-                if job.get("experience_level"):
-                    text_parts.append(f"Experience Level: {job['experience_level']}")
-                
-                if job.get("company"):
-                    text_parts.append(f"Company: {job['company']}")
-                    
-                if job.get("location"):
-                    text_parts.append(f"Location: {job['location']}")
-                    
-                if job.get("employment_type"):
-                    text_parts.append(f"Employment Type: {job['employment_type']}")
-                    
-                full_text = "\n".join(text_parts)
-                
-                # Skip if no meaningful text was generated
-                if not full_text.strip():
-                    self.logger.warning(f"Job {i+1} has no meaningful text content, skipping")
-                    continue
-                
-                self.logger.info(f"Job {i+1} text length: {len(full_text)} characters")
-                self.logger.debug(f"Job {i+1} text preview: {full_text[:200]}...")
-                
-                job_texts.append(full_text)
-                valid_jobs.append(i+1)
-                
-            if not job_texts:
-                raise Exception("No valid jobs with meaningful text content found")
+            job_texts = self._prepare_job_texts(jobs)
             
             # Get embeddings for all jobs at once
-            embeddings = self._get_sentence_embeddings(job_texts)
+            embeddings = self._embed_documents(job_texts)
             
             self.logger.info(f"Generated embeddings for {len(embeddings)} jobs")
             return embeddings
@@ -187,80 +527,212 @@ class EmbeddingHandler:
             self.logger.error(f"Error getting job embeddings: {e}")
             raise e
     
-    def get_resume_embedding(self, resume: Union[str, dict]) -> List[float]:
+    async def aget_job_embeddings(self, jobs: List[dict]) -> np.ndarray:
+        try:
+            job_texts = self._prepare_job_texts(jobs)
+            embeddings = await self._aembed_documents(job_texts)
+            self.logger.info(f"Generated embeddings for {len(embeddings)} jobs")
+            return embeddings
+            
+        except Exception as e:
+            self.logger.error(f"Error getting job embeddings: {e}")
+            raise e
+    
+    def _build_resume_text(self, resume: dict) -> str:
+        text_parts = []
+        if resume.get("name"):
+            text_parts.append(f"Name: {resume['name']}")
+        if resume.get("email"):
+            text_parts.append(f"Email: {resume['email']}")
+        if resume.get("phone"):
+            text_parts.append(f"Phone: {resume['phone']}")
+        if resume.get("location"):
+            text_parts.append(f"Location: {resume['location']}")
+        if resume.get("summary"):
+            text_parts.append(f"Summary: {resume['summary']}")
+        if resume.get("skills"):
+            skills_text = ", ".join(resume["skills"]) if isinstance(resume["skills"], list) else str(resume["skills"])
+            text_parts.append(f"Skills: {skills_text}")
+        if resume.get("experience"):
+            if isinstance(resume["experience"], list):
+                exp_text = "; ".join([str(e) for e in resume["experience"]])
+            else:
+                exp_text = str(resume["experience"])
+            text_parts.append(f"Experience: {exp_text}")
+        if resume.get("education"):
+            if isinstance(resume["education"], list):
+                edu_text = "; ".join([str(e) for e in resume["education"]])
+            else:
+                edu_text = str(resume["education"])
+            text_parts.append(f"Education: {edu_text}")
+        if resume.get("certifications"):
+            cert_text = ", ".join(resume["certifications"]) if isinstance(resume["certifications"], list) else str(resume["certifications"])
+            text_parts.append(f"Certifications: {cert_text}")
+        if resume.get("languages"):
+            lang_text = ", ".join(resume["languages"]) if isinstance(resume["languages"], list) else str(resume["languages"])
+            text_parts.append(f"Languages: {lang_text}")
+        if resume.get("projects"):
+            if isinstance(resume["projects"], list):
+                proj_text = "; ".join([str(p) for p in resume["projects"]])
+            else:
+                proj_text = str(resume["projects"])
+            text_parts.append(f"Projects: {proj_text}")
+
+        return "\n".join(text_parts)
+    
+    def _prepare_resume_text(self, resume: Union[str, dict]) -> str:
+        self.logger.info(f"Getting resume embedding for: {type(resume)}")
+        
+        # Handle string input (plain text resume)
+        if isinstance(resume, str):
+            if not resume.strip():
+                raise ValueError("Resume string cannot be empty")
+            self.logger.info(f"Processing resume as string, length: {len(resume)} characters")
+            return resume
+        
+        # Handle dict input (structured resume)
+        elif isinstance(resume, dict):
+            self.logger.info(f"Processing resume as dict with keys: {list(resume.keys())}")
+            
+            full_text = self._build_resume_text(resume)
+            
+            if not full_text.strip():
+                raise ValueError("Resume dict contains no meaningful text content")
+            
+            self.logger.info(f"Resume text length: {len(full_text)} characters")
+            self.logger.debug(f"Resume text preview: {full_text[:200]}...")
+            return full_text
+        
+        else:
+            raise ValueError(f"Resume must be string or dict, got {type(resume)}")
+    
+    def get_resume_text(self, resume: Union[str, dict]) -> str:
+        # The text a resume is embedded from; also the keyword query for hybrid search
+        return self._prepare_resume_text(resume)
+    
+    def get_resume_embedding(self, resume: Union[str, dict]) -> np.ndarray:
 
         # Get embedding for resume - can handle both string and dict input.
 
         try:
-            self.logger.info(f"Getting resume embedding for: {type(resume)}")
-            
-            # Handle string input (plain text resume)
-            if isinstance(resume, str):
-                if not resume.strip():
-                    raise ValueError("Resume string cannot be empty")
-                self.logger.info(f"Processing resume as string, length: {len(resume)} characters")
-                embedding = self.get_embeddings(resume)
-                self.logger.info(f"Generated embedding for resume string: {len(embedding)} dimensions")
-                return embedding
-            
-            # Handle dict input (structured resume)
-            elif isinstance(resume, dict):
-                self.logger.info(f"Processing resume as dict with keys: {list(resume.keys())}")
-                
-                text_parts = []
-                if resume.get("name"):
-                    text_parts.append(f"Name: {resume['name']}")
-                if resume.get("email"):
-                    text_parts.append(f"Email: {resume['email']}")
-                if resume.get("phone"):
-                    text_parts.append(f"Phone: {resume['phone']}")
-                if resume.get("location"):
-                    text_parts.append(f"Location: {resume['location']}")
-                if resume.get("summary"):
-                    text_parts.append(f"Summary: {resume['summary']}")
-                if resume.get("skills"):
-                    skills_text = ", ".join(resume["skills"]) if isinstance(resume["skills"], list) else str(resume["skills"])
-                    text_parts.append(f"Skills: {skills_text}")
-                if resume.get("experience"):
-                    if isinstance(resume["experience"], list):
-                        exp_text = "; ".join([str(e) for e in resume["experience"]])
-                    else:
-                        exp_text = str(resume["experience"])
-                    text_parts.append(f"Experience: {exp_text}")
-                if resume.get("education"):
-                    if isinstance(resume["education"], list):
-                        edu_text = "; ".join([str(e) for e in resume["education"]])
-                    else:
-                        edu_text = str(resume["education"])
-                    text_parts.append(f"Education: {edu_text}")
-                if resume.get("certifications"):
-                    cert_text = ", ".join(resume["certifications"]) if isinstance(resume["certifications"], list) else str(resume["certifications"])
-                    text_parts.append(f"Certifications: {cert_text}")
-                if resume.get("languages"):
-                    lang_text = ", ".join(resume["languages"]) if isinstance(resume["languages"], list) else str(resume["languages"])
-                    text_parts.append(f"Languages: {lang_text}")
-                if resume.get("projects"):
-                    if isinstance(resume["projects"], list):
-                        proj_text = "; ".join([str(p) for p in resume["projects"]])
-                    else:
-                        proj_text = str(resume["projects"])
-                    text_parts.append(f"Projects: {proj_text}")
-
-                full_text = "\n".join(text_parts)
-                
-                if not full_text.strip():
-                    raise ValueError("Resume dict contains no meaningful text content")
-                
-                self.logger.info(f"Resume text length: {len(full_text)} characters")
-                self.logger.debug(f"Resume text preview: {full_text[:200]}...")
-                
+            full_text = self._prepare_resume_text(resume)
+            if self._should_chunk(full_text):
+                embedding = self.get_chunked_embedding(full_text)
+            else:
                 embedding = self.get_embeddings(full_text)
-                self.logger.info(f"Generated embedding for resume dict: {len(embedding)} dimensions")
-                return embedding
-            
+            self.logger.info(f"Generated embedding for resume: {len(embedding)} dimensions")
+            return embedding
+
+        except Exception as e:
+            self.logger.error(f"Error getting resume embedding: {e}")
+            raise e
+    
+    async def aget_resume_embedding(self, resume: Union[str, dict]) -> np.ndarray:
+        try:
+            full_text = self._prepare_resume_text(resume)
+            if self._should_chunk(full_text):
+                embedding = await self.aget_chunked_embedding(full_text)
             else:
-                raise ValueError(f"Resume must be string or dict, got {type(resume)}")
+                embedding = await self.aget_embeddings(full_text)
+            self.logger.info(f"Generated embedding for resume: {len(embedding)} dimensions")
+            return embedding
 
         except Exception as e:
             self.logger.error(f"Error getting resume embedding: {e}")
-            raise e
\ No newline at end of file
+            raise e
+    
+    def get_resume_embeddings(self, resumes: List[Union[str, dict]]) -> np.ndarray:
+        # Embed many resumes in one batched call; returns a (n, dim) matrix in input order
+        try:
+            resume_texts = [self._prepare_resume_text(resume) for resume in resumes]
+            if not resume_texts:
+                raise ValueError("Resume list cannot be empty")
+            
+            embeddings = self._embed_documents(resume_texts)
+            
+            self.logger.info(f"Generated embeddings for {len(embeddings)} resumes")
+            return embeddings
+            
+        except Exception as e:
+            self.logger.error(f"Error getting resume embeddings: {e}")
+            raise e
+    
+    async def aget_resume_embeddings(self, resumes: List[Union[str, dict]]) -> np.ndarray:
+        try:
+            resume_texts = [self._prepare_resume_text(resume) for resume in resumes]
+            if not resume_texts:
+                raise ValueError("Resume list cannot be empty")
+            embeddings = await self._aembed_documents(resume_texts)
+            self.logger.info(f"Generated embeddings for {len(embeddings)} resumes")
+            return embeddings
+            
+        except Exception as e:
+            self.logger.error(f"Error getting resume embeddings: {e}")
+            raise e
+    
+    @staticmethod
+    def _join(value: Any, separator: str) -> str:
+        if isinstance(value, list):
+            return separator.join(str(v) for v in value if v)
+        return str(value) if value else ""
+    
+    def _build_job_sections(self, job: dict) -> Dict[str, str]:
+        skills = [self._join(job.get("required_skills"), ", "), self._join(job.get("qualifications"), "; ")]
+        experience = [self._join(job.get("responsibilities"), "; ")]
+        if job.get("experience_level"):
+            experience.append(f"Experience Level: {job['experience_level']}")
+        summary = [job.get("job_title") or "", job.get("job_domain") or "", job.get("summary") or ""]
+        return {
+            "skills": "\n".join(part for part in skills if part),
+            "experience": "\n".join(part for part in experience if part),
+            "summary": "\n".join(part for part in summary if part),
+        }
+    
+    def _build_resume_sections(self, resume: Union[str, dict]) -> Dict[str, str]:
+        if isinstance(resume, str):
+            # Unstructured resumes have no fields to split on
+            return {section: resume for section in self.SECTIONS}
+        skills = [self._join(resume.get("skills"), ", "), self._join(resume.get("certifications"), ", ")]
+        experience = [self._join(resume.get("experience"), "; "), self._join(resume.get("projects"), "; ")]
+        summary = [resume.get("summary") or "", self._join(resume.get("education"), "; ")]
+        return {
+            "skills": "\n".join(part for part in skills if part),
+            "experience": "\n".join(part for part in experience if part),
+            "summary": "\n".join(part for part in summary if part),
+        }
+    
+    def _embed_sections(self, documents: List[Dict[str, str]]) -> Dict[str, np.ndarray]:
+        # Every non-empty section of every document goes out in one batched call.
+        # Empty sections come back as zero rows; QdrantHandler skips those named vectors.
+        texts, slots = [], []
+        for row, sections in enumerate(documents):
+            for section in self.SECTIONS:
+                if sections.get(section, "").strip():
+                    texts.append(sections[section])
+                    slots.append((section, row))
+        
+        result = {section: np.zeros((len(documents), self.dimension), dtype=np.float32) for section in self.SECTIONS}
+        if texts:
+            embeddings = self._embed_documents(texts)
+            for (section, row), vector in zip(slots, embeddings):
+                result[section][row] = vector
+        return result
+    
+    def get_job_section_embeddings(self, jobs: List[dict]) -> Dict[str, np.ndarray]:
+        # Returns {section: (len(jobs), dim) float32 matrix}
+        try:
+            self.logger.info(f"Getting section embeddings for {len(jobs)} jobs")
+            return self._embed_sections([self._build_job_sections(job) for job in jobs])
+        except Exception as e:
+            self.logger.error(f"Error getting job section embeddings: {e}")
+            raise e
+    
+    def get_resume_section_embeddings(self, resume: Union[str, dict]) -> Dict[str, np.ndarray]:
+        # Returns {section: (dim,) float32 vector}
+        try:
+            self._prepare_resume_text(resume)
+            sections = self._embed_sections([self._build_resume_sections(resume)])
+            return {section: matrix[0] for section, matrix in sections.items()}
+        except Exception as e:
+            self.logger.error(f"Error getting resume section embeddings: {e}")
+            raise e
@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Any, List, Optional
+
+POOLING_STRATEGIES = ("mean", "cls", "max")
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    # In-place row normalization; all-zero rows are left as zeros
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def pool_ragged(token_matrices: List[np.ndarray], strategy: str = "mean", normalize: bool = True) -> np.ndarray:
+    # Pool a list of per-text (tokens_i, dim) matrices with different token counts in one pass.
+    # All tokens are packed into a single (total_tokens, dim) buffer and reduced per segment
+    # with reduceat, so no padding is materialized and short texts are not diluted by padding.
+    if strategy not in POOLING_STRATEGIES:
+        raise ValueError(f"Unknown pooling strategy '{strategy}', expected one of {POOLING_STRATEGIES}")
+    if not token_matrices:
+        return np.empty((0, 0), dtype=np.float32)
+
+    lengths = np.fromiter((len(m) for m in token_matrices), dtype=np.int64, count=len(token_matrices))
+    dim = token_matrices[0].shape[-1]
+    pooled = np.zeros((len(token_matrices), dim), dtype=np.float32)
+
+    # reduceat misbehaves on empty segments, so reduce only the texts that produced tokens
+    nonempty = lengths > 0
+    if nonempty.any():
+        flat = np.concatenate([m for m in token_matrices if len(m)], axis=0).astype(np.float32, copy=False)
+        kept_lengths = lengths[nonempty]
+        offsets = np.zeros(len(kept_lengths), dtype=np.int64)
+        np.cumsum(kept_lengths[:-1], out=offsets[1:])
+
+        if strategy == "mean":
+            pooled[nonempty] = np.add.reduceat(flat, offsets, axis=0) / kept_lengths[:, np.newaxis]
+        elif strategy == "cls":
+            pooled[nonempty] = flat[offsets]
+        else:
+            pooled[nonempty] = np.maximum.reduceat(flat, offsets, axis=0)
+
+    return l2_normalize(pooled) if normalize else pooled
+
+
+def pool_padded(token_embeddings: np.ndarray,
+                attention_mask: Optional[np.ndarray] = None,
+                strategy: str = "mean",
+                normalize: bool = True) -> np.ndarray:
+    # Pool a padded (batch, tokens, dim) tensor, ignoring positions where attention_mask is 0
+    if strategy not in POOLING_STRATEGIES:
+        raise ValueError(f"Unknown pooling strategy '{strategy}', expected one of {POOLING_STRATEGIES}")
+
+    token_embeddings = np.asarray(token_embeddings, dtype=np.float32)
+    if attention_mask is None:
+        attention_mask = np.ones(token_embeddings.shape[:2], dtype=np.float32)
+    mask = np.asarray(attention_mask, dtype=np.float32)[..., np.newaxis]
+
+    if strategy == "mean":
+        counts = np.maximum(mask.sum(axis=1), 1.0)
+        pooled = np.einsum("btd,bto->bd", token_embeddings, mask) / counts
+    elif strategy == "cls":
+        pooled = token_embeddings[:, 0, :].copy()
+    else:
+        pooled = np.where(mask > 0, token_embeddings, -np.inf).max(axis=1)
+        pooled[~np.isfinite(pooled)] = 0.0
+
+    pooled = np.ascontiguousarray(pooled, dtype=np.float32)
+    return l2_normalize(pooled) if normalize else pooled
+
+
+def pool_feature_extraction(outputs: Any, n_texts: int, strategy: str = "mean", normalize: bool = True) -> np.ndarray:
+    # Turn whatever feature_extraction returned into a contiguous (n_texts, dim) float32 matrix.
+    # Handles already-pooled sentence vectors, a padded 3-D array, and ragged nested lists.
+    if isinstance(outputs, np.ndarray) and outputs.dtype != object:
+        arr = outputs.astype(np.float32, copy=False)
+        if arr.ndim == 3:
+            return pool_padded(arr, strategy=strategy, normalize=normalize)
+        if arr.ndim == 2 and arr.shape[0] == n_texts:
+            # Sentence-level output from a model that pools server side
+            pooled = np.ascontiguousarray(arr)
+            return l2_normalize(pooled.copy()) if normalize else pooled
+        if arr.ndim == 2 and n_texts == 1:
+            # Token-level output for a single text: (tokens, dim)
+            return pool_ragged([arr], strategy=strategy, normalize=normalize)
+        raise ValueError(f"Unexpected feature_extraction output shape {arr.shape} for {n_texts} texts")
+
+    items = list(outputs)
+    if n_texts == 1 and items and np.ndim(items[0]) == 1 and len(items) != 1:
+        # Single text returned as a bare (tokens, dim) nested list
+        items = [items]
+    if len(items) != n_texts:
+        raise ValueError(f"feature_extraction returned {len(items)} outputs for {n_texts} texts")
+
+    matrices = []
+    for item in items:
+        matrix = np.asarray(item, dtype=np.float32)
+        if matrix.ndim == 3:
+            matrix = matrix.reshape(-1, matrix.shape[-1])
+        elif matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        matrices.append(matrix)
+    return pool_ragged(matrices, strategy=strategy, normalize=normalize)
@@ -0,0 +1,68 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class _Call:
+    # One in-flight computation that other threads can wait on
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        if not self.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for in-flight embedding request")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    # Coalesces concurrent work on the same key: the first caller to claim a key owns it,
+    # later callers get the owner's _Call and wait for its result instead of repeating the work.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.deduplicated = 0
+
+    def claim(self, keys: Iterable[str]) -> Tuple[List[str], Dict[str, _Call]]:
+        owned, waiting = [], {}
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    self._calls[key] = _Call()
+                    owned.append(key)
+                elif key not in waiting:
+                    waiting[key] = call
+            self.leaders += len(owned)
+            self.deduplicated += len(waiting)
+        return owned, waiting
+
+    def resolve(self, results: Dict[str, Any]):
+        with self._lock:
+            calls = [(self._calls.pop(key, None), value) for key, value in results.items()]
+        for call, value in calls:
+            if call is not None:
+                call.result = value
+                call.done.set()
+
+    def fail(self, keys: Iterable[str], error: BaseException):
+        # Also used as a safety net to release any owned keys that were not resolved
+        with self._lock:
+            calls = [self._calls.pop(key, None) for key in keys]
+        for call in calls:
+            if call is not None:
+                call.error = error
+                call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,52 @@
+import re
+import hashlib
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Small English stopword list; skill names and other content words are what the sparse side is for
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to "
+    "we will with you your".split()
+)
+
+
+class SparseEncoder:
+    # Local BM25-style term weights for Qdrant sparse vectors.
+    # Documents get BM25's saturated term frequency with length normalization; queries get 1.0 per
+    # distinct term. IDF is left to Qdrant (Modifier.IDF on the sparse vector), which keeps it
+    # correct as the catalog changes without re-encoding anything.
+    # Tokens keep "+", "#" and inner "." so skills like C++, C# and Node.js survive intact.
+
+    _token_pattern = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_length: float = 120.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    def tokenize(self, text: str) -> List[str]:
+        return [token for token in self._token_pattern.findall(text.lower()) if token not in _STOPWORDS]
+
+    @staticmethod
+    def term_index(token: str) -> int:
+        # Stable 31-bit term id; collisions are rare enough at catalog vocabulary sizes to ignore
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+        return int.from_bytes(digest, "little") & 0x7FFFFFFF
+
+    def _to_sparse(self, weights: Dict[int, float]) -> Tuple[List[int], List[float]]:
+        indices = sorted(weights)
+        return indices, [weights[index] for index in indices]
+
+    def encode_document(self, text: str) -> Tuple[List[int], List[float]]:
+        tokens = self.tokenize(text)
+        if not tokens:
+            return [], []
+        length_norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_doc_length)
+        weights: Dict[int, float] = {}
+        for token, tf in Counter(tokens).items():
+            index = self.term_index(token)
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (tf + length_norm)
+        return self._to_sparse(weights)
+
+    def encode_query(self, text: str) -> Tuple[List[int], List[float]]:
+        return self._to_sparse({self.term_index(token): 1.0 for token in set(self.tokenize(text))})
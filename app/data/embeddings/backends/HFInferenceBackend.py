@@ -0,0 +1,38 @@
+import numpy as np
+from typing import List, Optional
+from huggingface_hub import InferenceClient, AsyncInferenceClient
+from ..EmbeddingBackend import EmbeddingBackend
+from ..Pooling import pool_feature_extraction
+
+
+class HFInferenceBackend(EmbeddingBackend):
+    # Remote backend: token embeddings from the HF Inference API, pooled locally
+
+    name = "hf"
+
+    def __init__(self,
+                 model_name: str,
+                 api_token: Optional[str] = None,
+                 dimension: int = 384,
+                 pooling: str = "mean",
+                 normalize: bool = True,
+                 **kwargs):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.pooling = pooling
+        self.normalize = normalize
+        self.api_token = api_token
+        self.client = InferenceClient(api_key=api_token)
+        self._async_client = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        # Token-level output may be ragged across texts; pooling handles per-text token counts
+        outputs = self.client.feature_extraction(texts, model=self.model_name)
+        return pool_feature_extraction(outputs, len(texts), strategy=self.pooling, normalize=self.normalize)
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        # Non-blocking request over the async HTTP client; created lazily inside the running loop
+        if self._async_client is None:
+            self._async_client = AsyncInferenceClient(api_key=self.api_token)
+        outputs = await self._async_client.feature_extraction(texts, model=self.model_name)
+        return pool_feature_extraction(outputs, len(texts), strategy=self.pooling, normalize=self.normalize)
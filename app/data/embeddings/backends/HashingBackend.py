@@ -0,0 +1,33 @@
+import re
+import hashlib
+import numpy as np
+from typing import List
+from ..EmbeddingBackend import EmbeddingBackend
+
+
+class HashingBackend(EmbeddingBackend):
+    # Deterministic offline embedder for tests and air-gapped runs.
+    # Each token is hashed to a signed bucket (feature hashing) and the result is L2 normalized,
+    # so identical texts always map to identical vectors and shared words raise cosine similarity.
+
+    name = "hashing"
+    _token_pattern = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = 384, **kwargs):
+        self.dimension = dimension
+
+    def _bucket(self, token: str):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimension, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in self._token_pattern.findall(text.lower()):
+                index, sign = self._bucket(token)
+                matrix[row, index] += sign
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
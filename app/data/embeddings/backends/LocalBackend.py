@@ -0,0 +1,52 @@
+import logging
+import numpy as np
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from ..EmbeddingBackend import EmbeddingBackend
+
+
+class LocalBackend(EmbeddingBackend):
+    # In-process CPU backend running the sentence-transformers model from a local path or the HF cache.
+    # Batches are encoded on a thread pool; the model's forward pass releases the GIL.
+
+    name = "local"
+
+    def __init__(self,
+                 model_name: str,
+                 model_path: Optional[str] = None,
+                 batch_size: int = 32,
+                 max_workers: int = 2,
+                 dimension: int = 384,
+                 **kwargs):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "The local embedding backend requires sentence-transformers. "
+                "Install it with `pip install sentence-transformers`."
+            ) from e
+
+        self.logger = logging.getLogger(__name__)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_path or model_name, device="cpu")
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        if self.dimension != dimension:
+            raise ValueError(f"Local model produces {self.dimension}-dim embeddings, expected {dimension}")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed")
+        self.logger.info(f"Loaded local embedding model from {model_path or model_name}")
+
+    def _encode(self, batch: List[str]) -> np.ndarray:
+        return self.model.encode(batch, batch_size=len(batch), convert_to_numpy=True, show_progress_bar=False)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._encode(batches[0]).astype(np.float32, copy=False)
+
+        # map() preserves input order
+        results = list(self.executor.map(self._encode, batches))
+        return np.concatenate(results, axis=0).astype(np.float32, copy=False)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -2,13 +2,28 @@ import os
 import logging
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import streamlit as st
 from bson import ObjectId
+from bson.errors import InvalidId
 
 
 class MongoDBHandler:
+    
+    # Fields the job listings show; list_jobs returns only these unless asked otherwise
+    CARD_FIELDS = ["job_title", "company", "location", "job_domain", "experience_level", "employment_type",
+                   "salary_range", "required_skills", "summary", "created_at"]
+    
+    # Fields the recommendation filters match on; mirrors QdrantHandler.FILTER_FIELDS
+    FILTER_FIELDS = ["job_domain", "experience_level", "employment_type", "location", "required_skills"]
+    
+    # $text index weights: a hit in the title outranks one in the skills, then company, then summary
+    TEXT_INDEX_WEIGHTS = {"job_title": 10, "required_skills": 5, "company": 3, "summary": 1}
+    
+    # Indexes are created once per process, not on every page's handler
+    _indexes_ensured = False
+    
     def __init__(self):
         self.client = None
         self.db = None
@@ -37,6 +52,9 @@ class MongoDBHandler:
             # Test connection
             self.client.admin.command('ping')
             logging.info("Successfully connected to MongoDB")
+            
+            if not MongoDBHandler._indexes_ensured:
+                MongoDBHandler._indexes_ensured = self.ensure_indexes()
             return True
             
         except PyMongoError as e:
@@ -44,6 +62,26 @@ class MongoDBHandler:
             st.error(f"Failed to connect to MongoDB: {e}")
             return False
     
+    def ensure_indexes(self) -> bool:
+        # Create the job indexes; create_index is a no-op for indexes that already exist
+        try:
+            # Backs search_jobs, ranked by textScore
+            self.jobs_collection.create_index(
+                [(field, "text") for field in self.TEXT_INDEX_WEIGHTS],
+                weights=self.TEXT_INDEX_WEIGHTS,
+                name="job_text",
+            )
+            # Backs list_jobs: newest first, _id breaks ties between jobs stored in the same insert
+            self.jobs_collection.create_index([("created_at", -1), ("_id", -1)], name="created_at_id")
+            for field in self.FILTER_FIELDS:
+                self.jobs_collection.create_index(field, name=field)
+            logging.info("MongoDB job indexes ready")
+            return True
+            
+        except PyMongoError as e:
+            logging.error(f"Error creating job indexes: {e}")
+            return False
+    
     def store_jobs(self, jobs_data: Any) -> Optional[List[str]]:
         try:
             if isinstance(jobs_data, dict):
@@ -84,6 +122,34 @@ class MongoDBHandler:
             logging.error(f"Error retrieving job: {e}")
             return None
     
+    def get_jobs_by_ids(self,
+                        job_ids: List[str],
+                        projection: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+        # One $in query for many jobs. Returns (jobs, missing_ids): jobs follow the order of job_ids
+        # (e.g. a vector search ranking) and missing_ids lists the IDs with no document, in order.
+        try:
+            object_ids = {}
+            for job_id in job_ids:
+                try:
+                    object_ids[job_id] = ObjectId(job_id)
+                except (InvalidId, TypeError):
+                    logging.warning(f"Invalid job ID: {job_id}")
+            
+            found = {}
+            if object_ids:
+                fields = {field: 1 for field in projection} if projection else None
+                for job in self.jobs_collection.find({"_id": {"$in": list(object_ids.values())}}, fields):
+                    job["_id"] = str(job["_id"])
+                    found[job["_id"]] = job
+            
+            jobs = [found[job_id] for job_id in job_ids if job_id in found]
+            missing = [job_id for job_id in job_ids if job_id not in found]
+            return jobs, missing
+            
+        except PyMongoError as e:
+            logging.error(f"Error retrieving jobs: {e}")
+            return [], list(job_ids)
+    
     def get_all_jobs(self) -> List[Dict[str, Any]]:
         try:
             jobs = list(self.jobs_collection.find().sort("created_at", -1))
@@ -98,6 +164,78 @@ class MongoDBHandler:
             logging.error(f"Error retrieving jobs: {e}")
             return []
 
+    def list_jobs(self,
+                  page_size: int = 20,
+                  after: Optional[Tuple[Any, str]] = None,
+                  projection: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, str]]]:
+        # One page of jobs, newest first. Returns (jobs, next_cursor); pass next_cursor back as after to get
+        # the following page, it is None on the last page. Pages are keyset-paginated on (created_at, _id)
+        # through the created_at_id index, so every page costs the same however deep it is.
+        # projection defaults to CARD_FIELDS; pass [] for whole documents.
+        try:
+            query = {}
+            if after:
+                created_at, last_id = after[0], ObjectId(after[1])
+                if created_at is None:
+                    # Jobs without created_at sort last, ordered by _id alone
+                    query = {"created_at": None, "_id": {"$lt": last_id}}
+                else:
+                    query = {"$or": [
+                        {"created_at": {"$lt": created_at}},
+                        {"created_at": created_at, "_id": {"$lt": last_id}},
+                        {"created_at": None},
+                    ]}
+            
+            fields = self.CARD_FIELDS if projection is None else projection
+            # The cursor needs created_at even when the caller's projection leaves it out
+            drop_created_at = bool(fields) and "created_at" not in fields
+            fields = {field: 1 for field in fields} if fields else None
+            if drop_created_at:
+                fields["created_at"] = 1
+            # One extra document tells whether another page follows
+            jobs = list(self.jobs_collection.find(query, fields)
+                        .sort([("created_at", -1), ("_id", -1)])
+                        .limit(page_size + 1))
+            
+            next_cursor = None
+            if len(jobs) > page_size:
+                jobs = jobs[:page_size]
+                next_cursor = (jobs[-1].get("created_at"), str(jobs[-1]["_id"]))
+            
+            for job in jobs:
+                job["_id"] = str(job["_id"])
+                if drop_created_at:
+                    job.pop("created_at", None)
+            
+            return jobs, next_cursor
+            
+        except (PyMongoError, InvalidId) as e:
+            logging.error(f"Error listing jobs: {e}")
+            return [], None
+    
+    def iter_jobs(self, batch_size: int = 500, projection: Optional[List[str]] = None):
+        # Stream jobs newest first, one list_jobs page per query, for consumers that walk the whole
+        # catalog without holding it in memory
+        cursor = None
+        while True:
+            jobs, cursor = self.list_jobs(page_size=batch_size, after=cursor, projection=projection)
+            yield from jobs
+            if cursor is None:
+                return
+    
+    def iter_job_batches(self, batch_size: int = 256, after_id: Optional[str] = None):
+        # Stream every job in _id order, batch_size documents per query. Each query resumes after the
+        # last _id seen (keyset pagination), so a caller can checkpoint after_id and pick up later.
+        last_id = ObjectId(after_id) if after_id else None
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id else {}
+            batch = list(self.jobs_collection.find(query).sort("_id", 1).limit(batch_size))
+            if not batch:
+                return
+            last_id = batch[-1]["_id"]
+            for job in batch:
+                job["_id"] = str(job["_id"])
+            yield batch
     
     def delete_job(self, job_id: str) -> bool:
         try:
@@ -132,6 +270,73 @@ class MongoDBHandler:
             logging.error(f"Error counting jobs: {e}")
             return 0
 
+    @staticmethod
+    def _count_by(field: str, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        # $facet branch: {value: count} groups for field, largest first, skipping missing/empty values
+        stages = [
+            {"$match": {field: {"$nin": [None, ""]}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+        return stages + [{"$limit": top}] if top else stages
+    
+    def get_analytics_summary(self, top: int = 10) -> Dict[str, Any]:
+        # Dashboard numbers from one $facet aggregation, so only the counts leave MongoDB.
+        # Returns total_jobs, companies, locations and domains (distinct counts) and the
+        # {value: count} breakdowns by_domain, by_experience, top_locations and top_skills.
+        try:
+            skills = {"$cond": [
+                {"$isArray": "$required_skills"},
+                "$required_skills",
+                {"$cond": [
+                    {"$eq": [{"$type": "$required_skills"}, "string"]},
+                    # Older jobs store skills as one string separated by commas, semicolons or newlines
+                    {"$map": {
+                        "input": {"$regexFindAll": {"input": "$required_skills", "regex": "[^,;\\n]+"}},
+                        "in": "$$this.match",
+                    }},
+                    [],
+                ]},
+            ]}
+            pipeline = [{"$facet": {
+                "total_jobs": [{"$count": "count"}],
+                "companies": self._count_by("company") + [{"$count": "count"}],
+                "locations": self._count_by("location") + [{"$count": "count"}],
+                "top_locations": self._count_by("location", top),
+                "by_domain": self._count_by("job_domain"),
+                "by_experience": self._count_by("experience_level"),
+                "top_skills": [
+                    {"$project": {"skill": skills}},
+                    {"$unwind": "$skill"},
+                    {"$project": {"skill": {"$trim": {"input": "$skill"}}}},
+                    *self._count_by("skill", top),
+                ],
+            }}]
+            facets = next(self.jobs_collection.aggregate(pipeline), {})
+            
+            def total(name):
+                rows = facets.get(name) or []
+                return rows[0]["count"] if rows else 0
+            
+            def counts(name):
+                return {row["_id"]: row["count"] for row in facets.get(name) or []}
+            
+            by_domain = counts("by_domain")
+            return {
+                "total_jobs": total("total_jobs"),
+                "companies": total("companies"),
+                "locations": total("locations"),
+                "domains": len(by_domain),
+                "by_domain": by_domain,
+                "by_experience": counts("by_experience"),
+                "top_locations": counts("top_locations"),
+                "top_skills": counts("top_skills"),
+            }
+            
+        except PyMongoError as e:
+            logging.error(f"Error building analytics summary: {e}")
+            return {}
+    
     def close_connection(self):
         # Close MongoDB connection
         if self.client:
@@ -139,36 +344,32 @@ class MongoDBHandler:
             logging.info("MongoDB connection closed")
             
                 
-    def search_jobs(self, search_term: str = "") -> List[Dict[str, Any]]:
-        """Search jobs by a text term using regex (no index required)"""
+    def search_jobs(self,
+                    search_term: str = "",
+                    limit: int = 50,
+                    projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # Search jobs through the job_text index, best match first. Matches whole words (stemmed, so
+        # "developers" finds "developer"), quoted "exact phrases" and -excluded words.
+        # projection defaults to CARD_FIELDS; pass [] for whole documents.
         try:
             if not search_term or not search_term.strip():
-                # Return all jobs if no search term
-                jobs = list(self.jobs_collection.find().sort("created_at", -1))
-            else:
-                search_term = search_term.strip()
-                
-                # Use regex search (case-insensitive)
-                regex_pattern = {"$regex": search_term, "$options": "i"}
-                query = {
-                    "$or": [
-                        {"job_title": regex_pattern},
-                        {"company": regex_pattern},
-                        {"summary": regex_pattern},
-                        {"location": regex_pattern},
-                        {"employment_type": regex_pattern},
-                        {"experience_level": regex_pattern},
-                        {"required_skills": {"$elemMatch": {"$regex": search_term, "$options": "i"}}}
-                    ]
-                }
-                jobs = list(self.jobs_collection.find(query).limit(limit).sort("created_at", -1))
-
+                # Newest jobs if no search term
+                return self.list_jobs(page_size=limit, projection=projection)[0]
+            
+            fields = self.CARD_FIELDS if projection is None else projection
+            fields = {field: 1 for field in fields} if fields else {}
+            fields["score"] = {"$meta": "textScore"}
+            
+            jobs = list(self.jobs_collection.find({"$text": {"$search": search_term.strip()}}, fields)
+                        .sort([("score", {"$meta": "textScore"}), ("created_at", -1)])
+                        .limit(limit))
+            
             # Convert ObjectId to string
             for job in jobs:
                 job["_id"] = str(job["_id"])
-
+            
             return jobs
-
+            
         except PyMongoError as e:
             logging.error(f"Error searching jobs: {e}")
             return []
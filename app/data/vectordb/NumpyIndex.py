@@ -0,0 +1,593 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union
+import numpy as np
+import streamlit as st
+
+
+class _IndexStore:
+    # State of one index directory, shared by every NumpyIndexHandler opened on it in this process.
+    # Handlers are rebuilt per pipeline / session / rerun; if each kept its own copy, one handler's
+    # id_map.json write would drop another's jobs and a compaction would move vectors.npy out from
+    # under the other memory maps.
+    # - Vectors are L2-normalized rows of one contiguous float32 matrix in a memory-mapped .npy file,
+    #   so a cold start maps the file instead of reading it. Rows past `size` are spare capacity.
+    # - id_map.json holds job_id (or None for a deleted row) and the filterable fields per row as of the
+    #   last checkpoint; id_map.log appends the rows changed since, so a store or delete writes only the
+    #   rows it touched. The log is folded into a new id_map.json at compaction or once it outgrows the index.
+    # - Filterable fields are also kept as NumPy columns: an int code per row for single-valued fields,
+    #   a row array per value for multi-valued ones, so a filter is a few vectorized compares.
+
+    VECTORS_FILE = "vectors.npy"
+    ID_MAP_FILE = "id_map.json"
+    ID_MAP_LOG_FILE = "id_map.log"
+    MIN_LOG_ENTRIES = 1024
+
+    SCALAR_FIELDS = ("job_domain", "experience_level", "employment_type", "location")
+    MULTI_VALUE_FIELDS = ("required_skills",)
+
+    _instances: Dict[str, "_IndexStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, index_dir: str, dimension: int):
+        self.index_dir = index_dir
+        self.dimension = dimension
+        self.lock = threading.RLock()
+        self.vectors: Optional[np.memmap] = None
+        self.size = 0
+        self.job_ids: List[Optional[str]] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.rows: Dict[str, int] = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.tombstones = 0
+        # Bumped at every checkpoint; a log whose header names another generation is stale
+        self.generation = 0
+        self.log_entries = 0
+        self._reset_columns(0)
+
+    @classmethod
+    def for_dir(cls, index_dir: str, dimension: int) -> "_IndexStore":
+        # One store per index directory per process; opened (or created) on first use
+        key = os.path.abspath(index_dir)
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(key, dimension)
+                store.open()
+                cls._instances[key] = store
+        if store.dimension != dimension:
+            raise ValueError(f"Index dimension {store.dimension} does not match expected {dimension}")
+        return store
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.index_dir, self.VECTORS_FILE)
+
+    @property
+    def id_map_path(self) -> str:
+        return os.path.join(self.index_dir, self.ID_MAP_FILE)
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.index_dir, self.ID_MAP_LOG_FILE)
+
+    def open(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self.lock:
+            if os.path.exists(self.vectors_path) and os.path.exists(self.id_map_path):
+                self._load()
+            else:
+                self.vectors = self._create_matrix(self.vectors_path, 1024)
+                self.alive = np.zeros(len(self.vectors), dtype=bool)
+                self._reset_columns(len(self.vectors))
+                self.save_id_map()
+
+    def _create_matrix(self, path: str, capacity: int) -> np.memmap:
+        return np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(capacity, self.dimension))
+
+    def _load(self):
+        with open(self.id_map_path, "r", encoding="utf-8") as f:
+            id_map = json.load(f)
+        if id_map["dimension"] != self.dimension:
+            raise ValueError(f"Index dimension {id_map['dimension']} does not match expected {self.dimension}")
+
+        self.vectors = np.load(self.vectors_path, mmap_mode="r+")
+        self.job_ids = id_map["job_ids"]
+        self.payloads = id_map["payloads"]
+        self.generation = id_map.get("generation", 0)
+        log_ok = self._replay_log()
+        self.size = len(self.job_ids)
+        self.rows = {job_id: row for row, job_id in enumerate(self.job_ids) if job_id is not None}
+        # Liveness is tracked for the whole capacity so appended rows can be flagged in place
+        self.alive = np.zeros(len(self.vectors), dtype=bool)
+        self.alive[:self.size] = [job_id is not None for job_id in self.job_ids]
+        self.tombstones = self.size - len(self.rows)
+        self._rebuild_columns()
+        if not log_ok:
+            self.save_id_map()
+
+    def _replay_log(self) -> bool:
+        # Applies the log on top of the loaded snapshot. Returns False when the log can't simply be appended
+        # to: missing (older index), left over from the previous generation, or ending in a torn write.
+        self.log_entries = 0
+        if not os.path.exists(self.log_path):
+            return False
+        with open(self.log_path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        lines = content.splitlines()
+        try:
+            if not lines or json.loads(lines[0]).get("generation") != self.generation:
+                return False
+        except (ValueError, AttributeError):
+            return False
+
+        complete = content.endswith("\n")
+        try:
+            entries = json.loads("[" + ",".join(lines[1:]) + "]")
+        except ValueError:
+            # Only a crash mid-append leaves a broken line, and only at the end; keep the entries before it
+            entries, complete = [], False
+            for line in lines[1:]:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+
+        for entry in entries:
+            row = entry["row"]
+            if row >= len(self.job_ids):
+                missing = row + 1 - len(self.job_ids)
+                self.job_ids.extend([None] * missing)
+                self.payloads.extend([None] * missing)
+            self.job_ids[row] = entry["job_id"]
+            self.payloads[row] = entry["payload"]
+        self.log_entries = len(entries)
+        return complete
+
+    def save_id_map(self):
+        # Checkpoint: write-then-rename a full snapshot, then start an empty log for the new generation.
+        # A crash in between leaves the previous generation's log, which _load then ignores.
+        self.generation += 1
+        tmp_path = self.id_map_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dimension": self.dimension, "generation": self.generation,
+                       "job_ids": self.job_ids, "payloads": self.payloads}, f)
+        os.replace(tmp_path, self.id_map_path)
+
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"generation": self.generation}) + "\n")
+        os.replace(tmp_path, self.log_path)
+        self.log_entries = 0
+
+    def log_rows(self, rows: List[int]):
+        # Appends the current job_id and payload of each row; call after the rows' vectors are flushed.
+        # Once the log would pass half the index, a checkpoint is written instead, which keeps both
+        # startup replay and bulk loads from growing a log larger than the snapshot itself.
+        if not rows:
+            return
+        if self.log_entries + len(rows) > max(self.size // 2, self.MIN_LOG_ENTRIES):
+            self.save_id_map()
+            return
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps({"row": row, "job_id": self.job_ids[row], "payload": self.payloads[row]}) + "\n"
+                            for row in rows))
+        self.log_entries += len(rows)
+
+    def close(self):
+        with self._instances_lock:
+            if self._instances.get(self.index_dir) is self:
+                del self._instances[self.index_dir]
+        self.vectors = None
+
+    # --- filter columns ----------------------------------------------------
+
+    def _reset_columns(self, capacity: int):
+        # Code 0 means "no value"; codes[field] maps each seen value to its code
+        self.codes: Dict[str, Dict[Any, int]] = {field: {} for field in self.SCALAR_FIELDS}
+        self.columns: Dict[str, np.ndarray] = {field: np.zeros(capacity, dtype=np.int32) for field in self.SCALAR_FIELDS}
+        self.postings: Dict[str, Dict[Any, set]] = {field: {} for field in self.MULTI_VALUE_FIELDS}
+        # Array form of each posting set, built on first filtered use and dropped when the set changes
+        self._posting_arrays: Dict[str, Dict[Any, np.ndarray]] = {field: {} for field in self.MULTI_VALUE_FIELDS}
+
+    def _rebuild_columns(self):
+        self._reset_columns(len(self.vectors))
+        for row, payload in enumerate(self.payloads):
+            if payload is not None:
+                self.index_row(row, payload)
+
+    @staticmethod
+    def _values(stored: Any) -> List[Any]:
+        values = stored if isinstance(stored, list) else [stored]
+        return [value for value in values if value not in (None, "") and isinstance(value, (str, int, float, bool))]
+
+    def index_row(self, row: int, payload: Dict[str, Any]):
+        for field in self.SCALAR_FIELDS:
+            values = self._values(payload.get(field))
+            codes = self.codes[field]
+            self.columns[field][row] = codes.setdefault(values[0], len(codes) + 1) if values else 0
+        for field in self.MULTI_VALUE_FIELDS:
+            for value in self._values(payload.get(field)):
+                self.postings[field].setdefault(value, set()).add(row)
+                self._posting_arrays[field].pop(value, None)
+
+    def unindex_row(self, row: int, payload: Optional[Dict[str, Any]]):
+        # Scalar codes are simply overwritten or masked out by `alive`; posting sets need the row removed
+        if payload is None:
+            return
+        for field in self.MULTI_VALUE_FIELDS:
+            for value in self._values(payload.get(field)):
+                rows = self.postings[field].get(value)
+                if rows is not None:
+                    rows.discard(row)
+                    self._posting_arrays[field].pop(value, None)
+
+    def filter_mask(self, conditions: List[Tuple[str, set]]) -> np.ndarray:
+        # Fields are ANDed; within a field, any allowed value matches
+        mask = np.ones(self.size, dtype=bool)
+        for field, allowed in conditions:
+            if field in self.MULTI_VALUE_FIELDS:
+                field_mask = np.zeros(self.size, dtype=bool)
+                for value in allowed:
+                    field_mask[self._posting_array(field, value)] = True
+                mask &= field_mask
+            else:
+                codes = [self.codes[field][value] for value in allowed if value in self.codes[field]]
+                column = self.columns[field][:self.size]
+                if not codes:
+                    mask[:] = False
+                elif len(codes) <= 4:
+                    field_mask = column == codes[0]
+                    for code in codes[1:]:
+                        field_mask |= column == code
+                    mask &= field_mask
+                else:
+                    # Lookup table over the field's codes; one gather beats many compares or np.isin
+                    allowed_codes = np.zeros(len(self.codes[field]) + 1, dtype=bool)
+                    allowed_codes[codes] = True
+                    mask &= allowed_codes[column]
+        return mask
+
+    def _posting_array(self, field: str, value: Any) -> np.ndarray:
+        array = self._posting_arrays[field].get(value)
+        if array is None:
+            rows = self.postings[field].get(value, ())
+            array = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            self._posting_arrays[field][value] = array
+        return array
+
+    # --- storage -------------------------------------------------------------
+
+    def ensure_capacity(self, rows: int):
+        capacity = len(self.vectors)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        tmp_path = self.vectors_path + ".tmp"
+        grown = self._create_matrix(tmp_path, capacity)
+        grown[:self.size] = self.vectors[:self.size]
+        grown.flush()
+        del grown
+        self.vectors = None
+        os.replace(tmp_path, self.vectors_path)
+        self.vectors = np.load(self.vectors_path, mmap_mode="r+")
+
+        self.alive = self._grow(self.alive, capacity)
+        for field in self.SCALAR_FIELDS:
+            self.columns[field] = self._grow(self.columns[field], capacity)
+
+    @staticmethod
+    def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros(capacity, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def compact(self) -> int:
+        # Rewrite the matrix without tombstoned rows; the new files replace the old ones atomically.
+        # Returns the number of rows dropped.
+        keep = np.flatnonzero(self.alive[:self.size])
+        capacity = max(1024, 1 << int(len(keep)).bit_length())
+        tmp_path = self.vectors_path + ".tmp"
+        compacted = self._create_matrix(tmp_path, capacity)
+        compacted[:len(keep)] = self.vectors[keep]
+        compacted.flush()
+        del compacted
+
+        self.vectors = None
+        os.replace(tmp_path, self.vectors_path)
+        self.vectors = np.load(self.vectors_path, mmap_mode="r+")
+
+        dropped = self.size - len(keep)
+        self.job_ids = [self.job_ids[row] for row in keep]
+        self.payloads = [self.payloads[row] for row in keep]
+        self.rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.alive[:len(keep)] = True
+        self.size = len(keep)
+        self.tombstones = 0
+        self._rebuild_columns()
+        self.save_id_map()
+        return dropped
+
+
+class NumpyIndexHandler:
+    # Exact in-process vector index with the same interface as QdrantHandler, for catalogs small
+    # enough (a few hundred thousand jobs) that brute force beats a network hop.
+    # Every handler on the same index directory works on one shared _IndexStore (see above).
+    # Deletes only tombstone the row; compaction rewrites the matrix once enough rows are dead.
+
+    FILTER_FIELDS = _IndexStore.SCALAR_FIELDS + _IndexStore.MULTI_VALUE_FIELDS
+
+    def __init__(self, index_dir: Optional[str] = None, dimension: int = 384):
+        self.index_dir = index_dir or os.getenv("VECTOR_INDEX_DIR") or st.secrets.get("VECTOR_INDEX_DIR") or ".cache/vector_index"
+        self.vector_size = dimension
+        self.logger = logging.getLogger(__name__)
+
+        # Compact once this fraction of stored rows are tombstones
+        self.compact_ratio = float(os.getenv("VECTOR_INDEX_COMPACT_RATIO") or st.secrets.get("VECTOR_INDEX_COMPACT_RATIO") or 0.2)
+
+        # Interface parity with QdrantHandler: one unnamed vector, nothing displayable in the payload
+        self.named_vectors = False
+        self.sparse_vectors = False
+        self.payload_policy = "slim"
+
+        self._store: Optional[_IndexStore] = None
+
+        self.connect()
+
+    def connect(self):
+        try:
+            self._store = _IndexStore.for_dir(self.index_dir, self.vector_size)
+            self.logger.info(f"Opened local vector index at {self.index_dir} ({len(self._store.rows)} jobs)")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Local vector index error: {e}")
+            self._store = None
+            return False
+
+    def is_connected(self) -> bool:
+        return self._store is not None and self._store.vectors is not None
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.vector_size:
+            raise ValueError(f"Embedding dimension mismatch: expected {self.vector_size}, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def _build_payload(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {field: job_data.get(field, [] if field == "required_skills" else "") for field in self.FILTER_FIELDS}
+        payload["company"] = job_data.get("company", "")
+        return payload
+
+    def _write_rows(self, jobs: List[Dict[str, Any]], vectors: np.ndarray, job_ids: List[str]):
+        # Re-storing a job overwrites its row, like a deterministic-ID upsert in Qdrant
+        store = self._store
+        with store.lock:
+            new_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in store.rows]
+            store.ensure_capacity(store.size + len(new_ids))
+            for job_id in new_ids:
+                store.rows[job_id] = store.size
+                store.job_ids.append(job_id)
+                store.payloads.append(None)
+                store.size += 1
+
+            rows = [store.rows[job_id] for job_id in job_ids]
+            store.vectors[rows] = vectors
+            store.alive[rows] = True
+            for row, job in zip(rows, jobs):
+                store.unindex_row(row, store.payloads[row])
+                store.payloads[row] = self._build_payload(job)
+                store.index_row(row, store.payloads[row])
+
+            store.vectors.flush()
+            store.log_rows(list(dict.fromkeys(rows)))
+
+    def store_job_vector(self,
+                         job_data: Dict[str, Any],
+                         embedding: Union[np.ndarray, List[float]],
+                         job_id: str,
+                         section_embeddings: Optional[Dict[str, np.ndarray]] = None) -> bool:
+        try:
+            self._write_rows([job_data], self._normalize(embedding), [job_id])
+            self.logger.info(f"Successfully stored job vector for job_id: {job_id}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error storing job vector for job_id {job_id}: {e}")
+            return False
+
+    def store_job_vectors(self,
+                          jobs: List[Dict[str, Any]],
+                          embeddings: Union[np.ndarray, List[List[float]]],
+                          job_ids: List[str],
+                          section_embeddings: Optional[List[Optional[Dict[str, np.ndarray]]]] = None,
+                          batch_size: Optional[int] = None,
+                          wait: bool = False) -> Dict[str, bool]:
+        # section_embeddings / batch_size / wait are accepted for QdrantHandler compatibility and ignored
+        statuses = {job_id: False for job_id in job_ids}
+        try:
+            if not job_ids:
+                return statuses
+            self._write_rows(list(jobs), self._normalize(np.asarray(embeddings)), list(job_ids))
+            for job_id in job_ids:
+                statuses[job_id] = True
+            self.logger.info(f"Stored {len(job_ids)} job vectors")
+
+        except Exception as e:
+            self.logger.error(f"Error storing {len(job_ids)} job vectors: {e}")
+        return statuses
+
+    def _filter_conditions(self, filters: Optional[Dict[str, Any]]) -> List[Tuple[str, set]]:
+        # Same semantics as QdrantHandler._build_filter: scalars match exactly, lists match any, fields are ANDed
+        conditions = []
+        for field, value in (filters or {}).items():
+            if field not in self.FILTER_FIELDS:
+                raise ValueError(f"Cannot filter on '{field}'. Filterable fields: {list(self.FILTER_FIELDS)}")
+            if value is None or value == "" or value == []:
+                continue
+            conditions.append((field, set(value) if isinstance(value, (list, tuple, set)) else {value}))
+        return conditions
+
+    def _top_rows(self, queries: np.ndarray, limit: int, filters: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        # One (n_queries, size) matrix product, then argpartition per row: O(size) instead of a full sort.
+        # Returns (rows, scores), both (n_queries, k) and best first; call with the store lock held.
+        store = self._store
+        queries = self._normalize(queries)
+        candidates = store.alive[:store.size].copy()
+        conditions = self._filter_conditions(filters)
+        if conditions:
+            candidates &= store.filter_mask(conditions)
+
+        k = min(limit, int(candidates.sum()))
+        if k <= 0:
+            return np.empty((len(queries), 0), dtype=int), np.empty((len(queries), 0), dtype=np.float32)
+
+        scores = np.asarray(queries @ store.vectors[:store.size].T)
+        scores[:, ~candidates] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def _top_k(self, queries: np.ndarray, limit: int, filters: Optional[Dict[str, Any]]) -> List[Tuple[List[str], List[float]]]:
+        with self._store.lock:
+            top, top_scores = self._top_rows(queries, limit, filters)
+            return [([self._store.job_ids[row] for row in rows], row_scores.tolist())
+                    for rows, row_scores in zip(top, top_scores)]
+
+    def search_similar_jobs(self,
+                            query_vector: Union[np.ndarray, List[float]],
+                            limit: int = 10,
+                            section_vectors: Optional[Dict[str, np.ndarray]] = None,
+                            section_weights: Optional[Dict[str, float]] = None,
+                            filters: Optional[Dict[str, Any]] = None,
+                            query_text: Optional[str] = None):
+        # Section weighting and hybrid keyword matching need named / sparse vectors, which this index
+        # does not keep; the full vector is used
+        try:
+            job_ids, scores = self._top_k(np.asarray(query_vector), limit, filters)[0]
+            self.logger.info(f"Found {len(job_ids)} similar jobs")
+            return job_ids, scores
+
+        except Exception as e:
+            self.logger.error(f"Error searching similar jobs: {e}")
+            return [], []
+
+    def search_job_cards(self,
+                         query_vector: Union[np.ndarray, List[float]],
+                         limit: int = 10,
+                         section_vectors: Optional[Dict[str, np.ndarray]] = None,
+                         section_weights: Optional[Dict[str, float]] = None,
+                         filters: Optional[Dict[str, Any]] = None,
+                         query_text: Optional[str] = None):
+        # No card payload is kept locally, so every card is {"_id": job_id} for the caller to fill from Mongo
+        job_ids, scores = self.search_similar_jobs(query_vector, limit, section_vectors, section_weights, filters)
+        return [{"_id": job_id} for job_id in job_ids], scores
+
+    def search_similar_jobs_batch(self,
+                                  query_vectors: Union[np.ndarray, List[List[float]]],
+                                  limit: int = 10,
+                                  filters: Optional[Dict[str, Any]] = None,
+                                  query_texts: Optional[List[Optional[str]]] = None) -> List[Tuple[List[str], List[float]]]:
+        try:
+            results = self._top_k(np.asarray(query_vectors), limit, filters)
+            self.logger.info(f"Ran {len(results)} similar job searches in batch")
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error batch searching similar jobs: {e}")
+            return []
+
+    def search_job_cards_batch(self,
+                               query_vectors: Union[np.ndarray, List[List[float]]],
+                               limit: int = 10,
+                               filters: Optional[Dict[str, Any]] = None,
+                               query_texts: Optional[List[Optional[str]]] = None) -> List[Tuple[List[Dict[str, Any]], List[float]]]:
+        return [([{"_id": job_id} for job_id in job_ids], scores)
+                for job_ids, scores in self.search_similar_jobs_batch(query_vectors, limit, filters)]
+
+    def search_job_candidates(self,
+                              query_vector: Union[np.ndarray, List[float]],
+                              limit: int = 100,
+                              filters: Optional[Dict[str, Any]] = None,
+                              query_text: Optional[str] = None,
+                              with_cards: bool = False):
+        # Same contract as QdrantHandler.search_job_candidates; vectors are copied out of the memory map
+        try:
+            store = self._store
+            with store.lock:
+                top, top_scores = self._top_rows(np.asarray(query_vector), limit, filters)
+                rows, scores = top[0], top_scores[0]
+                candidates = [{"_id": store.job_ids[row], "company": store.payloads[row].get("company")} for row in rows]
+                return candidates, scores.tolist(), np.array(store.vectors[rows])
+
+        except Exception as e:
+            self.logger.error(f"Error fetching candidate jobs: {e}")
+            return [], [], np.empty((0, self.vector_size), dtype=np.float32)
+
+    def delete_job_vector(self, job_id: str) -> bool:
+        return self.delete_job_vectors([job_id])
+
+    def delete_job_vectors(self, job_ids: List[str]) -> bool:
+        try:
+            store = self._store
+            with store.lock:
+                deleted = []
+                for job_id in job_ids:
+                    row = store.rows.pop(job_id, None)
+                    if row is None:
+                        continue
+                    store.unindex_row(row, store.payloads[row])
+                    store.job_ids[row] = None
+                    store.payloads[row] = None
+                    store.alive[row] = False
+                    store.tombstones += 1
+                    deleted.append(row)
+
+                if store.size and store.tombstones / store.size > self.compact_ratio:
+                    self.compact()
+                else:
+                    store.log_rows(deleted)
+
+            self.logger.info(f"Successfully deleted {len(job_ids)} job vectors")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error deleting job vectors: {e}")
+            return False
+
+    def compact(self):
+        with self._store.lock:
+            dropped = self._store.compact()
+        self.logger.info(f"Compacted local vector index: dropped {dropped} deleted rows")
+
+    def get_collection_info(self) -> Dict[str, Any]:
+        store = self._store
+        if store is None:
+            return {"points_count": 0, "vectors_count": 0, "tombstones": 0, "status": "red"}
+        with store.lock:
+            return {
+                "points_count": len(store.rows),
+                "vectors_count": len(store.rows),
+                "tombstones": store.tombstones,
+                "status": "green" if self.is_connected() else "red"
+            }
+
+    def delete_collection(self) -> bool:
+        # Closes the shared store for every handler on this directory; new handlers start an empty index
+        try:
+            store = self._store
+            with store.lock:
+                store.close()
+                shutil.rmtree(store.index_dir, ignore_errors=True)
+            self.logger.info(f"Deleted local vector index: {self.index_dir}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting local vector index: {e}")
+            return False
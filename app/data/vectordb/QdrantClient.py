@@ -1,18 +1,117 @@
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Union
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+import weakref
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, MatchAny,
+    QueryRequest, PointIdsList, PayloadSchemaType, HnswConfigDiff, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization, BinaryQuantizationConfig,
+    VectorParamsDiff, CollectionParamsDiff, Disabled, CreateAlias, CreateAliasOperation, DeleteAlias,
+    DeleteAliasOperation, SparseVectorParams, SparseVector, Modifier, Prefetch, FusionQuery, Fusion, RrfQuery, Rrf
+)
 import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
+from data.embeddings.SparseEncoder import SparseEncoder
+
+# Namespace for deriving point IDs from Mongo job IDs; changing it orphans every stored point
+JOB_POINT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "ai-recruitment-platform/jobs")
+
 
 class QdrantHandler:
     
-    def __init__(self, collection_name: str = "jobs"):
+    # Named vectors used when section embeddings are enabled: the whole-document vector plus one per section
+    FULL_VECTOR = "full"
+    SECTION_VECTORS = ("skills", "experience", "summary")
+    
+    # Sparse BM25-style keyword vector stored next to the dense one(s) when hybrid search is enabled
+    SPARSE_VECTOR = "keywords"
+    SPARSE_TEXT_FIELDS = ("job_title", "job_domain", "required_skills", "summary", "description",
+                          "responsibilities", "qualifications")
+    HYBRID_FUSIONS = ("rrf", "dbsf")
+    
+    # Payload fields with keyword indexes; only these can be used in search filters
+    FILTER_FIELDS = ("job_domain", "experience_level", "employment_type", "location", "required_skills")
+    
+    # Fields a recommendation card / PDF export shows, stored under the "card" payload policy
+    CARD_FIELDS = ("job_title", "company", "location", "experience_level", "employment_type",
+                   "salary_range", "required_skills", "summary")
+    PAYLOAD_POLICIES = ("full", "slim", "card")
+    
+    QUANTIZATION_MODES = ("none", "scalar", "binary")
+    
+    # One QdrantClient per connection settings per process, shared by every handler/session.
+    # The embedded engine cannot open the same path twice, and ":memory:" would otherwise give
+    # each handler its own empty database.
+    _clients: Dict[str, QdrantClient] = {}
+    _clients_lock = threading.Lock()
+    # Collections already checked / created in this process, with their (named, sparse) vector layout
+    _ensured_collections: Dict[Tuple[str, str], Tuple[bool, bool]] = {}
+    
+    def __init__(self,
+                 collection_name: Optional[str] = None,
+                 named_vectors: Optional[bool] = None,
+                 create_alias: bool = True):
         self.client = None
-        self.collection_name = collection_name
+        # Live name searches and writes go through; an alias to a versioned collection (see ReindexPipeline)
+        self.collection_name = collection_name or os.getenv("QDRANT_COLLECTION") or st.secrets.get("QDRANT_COLLECTION") or "jobs"
+        # A missing collection is created as "<name>_v1" behind a "<name>" alias, so reindexing can
+        # later swap the alias without touching live data; False creates <name> itself
+        self.create_alias = create_alias
         self.vector_size = 384  # Groq embedding size (e.g., llama-3-8b)
         self.logger = logging.getLogger(__name__)
+        
+        if named_vectors is None:
+            named_vectors = str(os.getenv("QDRANT_NAMED_VECTORS") or st.secrets.get("QDRANT_NAMED_VECTORS") or "false").lower() == "true"
+        self.named_vectors = named_vectors
+        # Hybrid dense + sparse search; IDF is applied server-side, term weights come from SparseEncoder
+        self.sparse_vectors = str(os.getenv("QDRANT_SPARSE_VECTORS") or st.secrets.get("QDRANT_SPARSE_VECTORS") or "false").lower() == "true"
+        self.hybrid_fusion = (os.getenv("QDRANT_HYBRID_FUSION") or st.secrets.get("QDRANT_HYBRID_FUSION") or "rrf").lower()
+        if self.hybrid_fusion not in self.HYBRID_FUSIONS:
+            raise ValueError(f"QDRANT_HYBRID_FUSION must be one of {self.HYBRID_FUSIONS}, got '{self.hybrid_fusion}'")
+        # Optional "dense,sparse" weights, e.g. "1.0,0.5"; switches fusion to weighted RRF
+        hybrid_weights = os.getenv("QDRANT_HYBRID_WEIGHTS") or st.secrets.get("QDRANT_HYBRID_WEIGHTS")
+        self.hybrid_weights = [float(weight) for weight in hybrid_weights.split(",")] if hybrid_weights else None
+        self.hybrid_candidates_factor = 4
+        self.sparse_encoder = SparseEncoder()
+        # What to copy into each point's payload: "full", "slim" or "card" (see _build_payload)
+        self.payload_policy = (os.getenv("QDRANT_PAYLOAD_POLICY") or st.secrets.get("QDRANT_PAYLOAD_POLICY") or "full").lower()
+        if self.payload_policy not in self.PAYLOAD_POLICIES:
+            raise ValueError(f"QDRANT_PAYLOAD_POLICY must be one of {self.PAYLOAD_POLICIES}, got '{self.payload_policy}'")
+        
+        # Bulk upsert tuning
+        self.upsert_batch_size = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE") or st.secrets.get("QDRANT_UPSERT_BATCH_SIZE") or 256)
+        self.upsert_parallel = int(os.getenv("QDRANT_UPSERT_PARALLEL") or st.secrets.get("QDRANT_UPSERT_PARALLEL") or 4)
+        # Section searches over-fetch this many candidates per requested result before weighted fusion
+        self.section_candidates_factor = 4
+        # Queries per query_batch_points request in the batch search methods
+        self.search_batch_size = int(os.getenv("QDRANT_SEARCH_BATCH_SIZE") or st.secrets.get("QDRANT_SEARCH_BATCH_SIZE") or 128)
+        
+        # Index / storage tuning; unset HNSW values keep Qdrant's defaults (m=16, ef_construct=100)
+        self.hnsw_m = os.getenv("QDRANT_HNSW_M") or st.secrets.get("QDRANT_HNSW_M")
+        self.hnsw_ef_construct = os.getenv("QDRANT_HNSW_EF_CONSTRUCT") or st.secrets.get("QDRANT_HNSW_EF_CONSTRUCT")
+        self.search_ef = os.getenv("QDRANT_SEARCH_EF") or st.secrets.get("QDRANT_SEARCH_EF")
+        # "scalar" (int8, ~4x less vector RAM) or "binary" (~32x, needs rescoring to keep recall)
+        self.quantization = (os.getenv("QDRANT_QUANTIZATION") or st.secrets.get("QDRANT_QUANTIZATION") or "none").lower()
+        if self.quantization not in self.QUANTIZATION_MODES:
+            raise ValueError(f"QDRANT_QUANTIZATION must be one of {self.QUANTIZATION_MODES}, got '{self.quantization}'")
+        self.quantization_rescore = str(os.getenv("QDRANT_QUANTIZATION_RESCORE") or st.secrets.get("QDRANT_QUANTIZATION_RESCORE") or "true").lower() == "true"
+        self.quantization_oversampling = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING") or st.secrets.get("QDRANT_QUANTIZATION_OVERSAMPLING") or 2.0)
+        # Original vectors / payload on disk (memory-mapped); quantized vectors stay in RAM for the first pass
+        self.on_disk_vectors = str(os.getenv("QDRANT_ON_DISK_VECTORS") or st.secrets.get("QDRANT_ON_DISK_VECTORS") or "false").lower() == "true"
+        self.on_disk_payload = str(os.getenv("QDRANT_ON_DISK_PAYLOAD") or st.secrets.get("QDRANT_ON_DISK_PAYLOAD") or "false").lower() == "true"
+        # Push the settings above onto an existing collection at startup (triggers a background re-index)
+        self.apply_config_updates = str(os.getenv("QDRANT_APPLY_CONFIG_UPDATES") or st.secrets.get("QDRANT_APPLY_CONFIG_UPDATES") or "false").lower() == "true"
+        
+        self.local_mode = False
+        self._client_kwargs: Dict[str, Any] = {}
+        # AsyncQdrantClient per event loop, created on first use by the a* methods
+        self._async_clients = weakref.WeakKeyDictionary()
+        
         self.connect()
     
     def connect(self):
@@ -21,78 +120,368 @@ class QdrantHandler:
             # Get Qdrant configuration from environment or Streamlit secrets
             qdrant_url = os.getenv("QDRANT_URL") or st.secrets.get("QDRANT_URL")
             qdrant_api_key = os.getenv("QDRANT_API_KEY") or st.secrets.get("QDRANT_API_KEY")
+            # Embedded mode: QDRANT_PATH stores the collection on local disk, QDRANT_URL=":memory:" keeps it in RAM
+            qdrant_path = os.getenv("QDRANT_PATH") or st.secrets.get("QDRANT_PATH")
+            prefer_grpc = str(os.getenv("QDRANT_PREFER_GRPC") or st.secrets.get("QDRANT_PREFER_GRPC") or "false").lower() == "true"
+            grpc_port = int(os.getenv("QDRANT_GRPC_PORT") or st.secrets.get("QDRANT_GRPC_PORT") or 6334)
             
-            if not qdrant_url:
-                self.logger.error("Qdrant URL not found. Please set QDRANT_URL in environment or secrets.")
+            if qdrant_path:
+                self._client_kwargs = {"path": qdrant_path}
+            elif qdrant_url == ":memory:":
+                self._client_kwargs = {"location": ":memory:"}
+            elif qdrant_url:
+                self._client_kwargs = {"url": qdrant_url, "prefer_grpc": prefer_grpc, "grpc_port": grpc_port}
+                if qdrant_api_key:
+                    self._client_kwargs["api_key"] = qdrant_api_key
+            else:
+                self.logger.error("Qdrant URL not found. Please set QDRANT_URL (or QDRANT_PATH) in environment or secrets.")
                 return False
             
-            if qdrant_api_key:
-                self.client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
-            else:
-                self.client = QdrantClient(url=qdrant_url)
+            self.local_mode = "url" not in self._client_kwargs
+            if self.local_mode:
+                # The embedded engine runs in-process and is not safe for concurrent writers
+                self.upsert_parallel = 1
+            
+            self.client = self.shared_client(self._client_kwargs)
             
             # Check if collection exists, create if not
             self.ensure_collection_exists()
             
-            self.logger.info("Successfully connected to Qdrant")
+            transport = "embedded" if self.local_mode else ("gRPC" if prefer_grpc else "REST")
+            self.logger.info(f"Successfully connected to Qdrant ({transport})")
             return True
             
         except Exception as e:
             self.logger.error(f"Qdrant connection error: {e}")
             return False
     
+    @classmethod
+    def shared_client(cls, client_kwargs: Dict[str, Any]) -> QdrantClient:
+        key = cls._client_key(client_kwargs)
+        with cls._clients_lock:
+            if key not in cls._clients:
+                cls._clients[key] = QdrantClient(**client_kwargs)
+            return cls._clients[key]
+    
+    @staticmethod
+    def _client_key(client_kwargs: Dict[str, Any]) -> str:
+        return repr(sorted(client_kwargs.items()))
+    
+    @property
+    def _ensured_key(self) -> Tuple[str, str]:
+        return self._client_key(self._client_kwargs), self.collection_name
+    
+    def is_connected(self) -> bool:
+        return self.client is not None
+    
     def ensure_collection_exists(self):
         try:
+            layout = self._ensured_collections.get(self._ensured_key)
+            if layout is not None:
+                # Checked by an earlier handler in this process; skip the round trips
+                self.named_vectors, self.sparse_vectors = layout
+                return
+            
             collections = self.client.get_collections()
             collection_names = [col.name for col in collections.collections]
+            # collection_name may be an alias to a versioned collection (see ReindexPipeline)
+            alias_names = [alias.alias_name for alias in self.client.get_aliases().aliases]
             
-            if self.collection_name not in collection_names:
+            if self.collection_name not in collection_names and self.collection_name not in alias_names:
+                vector_params = VectorParams(
+                    size=self.vector_size,
+                    distance=Distance.COSINE,
+                    on_disk=self.on_disk_vectors
+                )
+                if self.named_vectors:
+                    vectors_config = {name: vector_params for name in (self.FULL_VECTOR,) + self.SECTION_VECTORS}
+                else:
+                    vectors_config = vector_params
+                
+                physical_name = f"{self.collection_name}_v1" if self.create_alias else self.collection_name
                 self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.vector_size,
-                        distance=Distance.COSINE
-                    ),
+                    collection_name=physical_name,
+                    vectors_config=vectors_config,
+                    hnsw_config=self._hnsw_config(),
+                    quantization_config=self._quantization_config(),
+                    on_disk_payload=self.on_disk_payload,
+                    sparse_vectors_config={
+                        self.SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)
+                    } if self.sparse_vectors else None,
                 )
-                self.logger.info(f"Created collection: {self.collection_name}")
+                if self.create_alias:
+                    self.client.update_collection_aliases(change_aliases_operations=[CreateAliasOperation(
+                        create_alias=CreateAlias(collection_name=physical_name, alias_name=self.collection_name)
+                    )])
+                self.logger.info(f"Created collection: {physical_name}"
+                                 + (f" (alias {self.collection_name})" if self.create_alias else ""))
+                self.ensure_payload_indexes()
             else:
                 self.logger.info(f"Collection {self.collection_name} already exists")
                 
+                # An existing collection's vector layout wins over configuration
+                info = self.client.get_collection(self.collection_name)
+                params = info.config.params
+                vectors = params.vectors
+                has_sparse = self.SPARSE_VECTOR in (params.sparse_vectors or {})
+                if has_sparse != self.sparse_vectors:
+                    self.logger.warning(
+                        f"Collection {self.collection_name} {'has' if has_sparse else 'has no'} sparse keyword vectors; "
+                        f"ignoring QDRANT_SPARSE_VECTORS={self.sparse_vectors}. Reindex to change the layout."
+                    )
+                    self.sparse_vectors = has_sparse
+                has_named = isinstance(vectors, dict)
+                if has_named != self.named_vectors:
+                    self.logger.warning(
+                        f"Collection {self.collection_name} uses {'named' if has_named else 'a single unnamed'} vector(s); "
+                        f"ignoring QDRANT_NAMED_VECTORS={self.named_vectors}. Reindex to change the layout."
+                    )
+                    self.named_vectors = has_named
+                
+                if self.apply_config_updates:
+                    self.update_collection_config()
+                
+                self.ensure_payload_indexes(existing=set(info.payload_schema or {}))
+            
+            self._ensured_collections[self._ensured_key] = (self.named_vectors, self.sparse_vectors)
+                
         except Exception as e:
             self.logger.error(f"Error ensuring collection exists: {e}")
             raise
     
-    def store_job_vector(self, job_data: Dict[str, Any], embedding: List[float], job_id: str) -> bool:
+    def _hnsw_config(self) -> Optional[HnswConfigDiff]:
+        if not (self.hnsw_m or self.hnsw_ef_construct):
+            return None
+        return HnswConfigDiff(
+            m=int(self.hnsw_m) if self.hnsw_m else None,
+            ef_construct=int(self.hnsw_ef_construct) if self.hnsw_ef_construct else None
+        )
+    
+    def _quantization_config(self):
+        if self.quantization == "scalar":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+    
+    def _search_params(self) -> Optional[SearchParams]:
+        # Per-query HNSW beam width, plus rescoring of quantized candidates against the original vectors
+        quantization = None
+        if self.quantization != "none":
+            quantization = QuantizationSearchParams(
+                rescore=self.quantization_rescore,
+                oversampling=self.quantization_oversampling if self.quantization_rescore else None
+            )
+        if self.search_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=int(self.search_ef) if self.search_ef else None, quantization=quantization)
+    
+    def update_collection_config(self) -> bool:
+        # Apply the configured HNSW / quantization / on-disk settings to an existing collection.
+        # Qdrant rebuilds the affected index segments in the background; searches keep working meanwhile.
+        try:
+            vector_diff = VectorParamsDiff(on_disk=self.on_disk_vectors)
+            vector_names = (self.FULL_VECTOR,) + self.SECTION_VECTORS if self.named_vectors else ("",)
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                vectors_config={name: vector_diff for name in vector_names},
+                hnsw_config=self._hnsw_config(),
+                quantization_config=self._quantization_config() or Disabled.DISABLED,
+                collection_params=CollectionParamsDiff(on_disk_payload=self.on_disk_payload),
+            )
+            self.logger.info(f"Updated collection {self.collection_name} config: quantization={self.quantization}, "
+                             f"hnsw_m={self.hnsw_m}, ef_construct={self.hnsw_ef_construct}, "
+                             f"on_disk_vectors={self.on_disk_vectors}, on_disk_payload={self.on_disk_payload}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating collection config: {e}")
+            return False
+    
+    def resolve_collection(self) -> str:
+        # Physical collection behind collection_name when it is an alias, otherwise collection_name itself
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return self.collection_name
+    
+    def switch_alias(self, target_collection: str, replace_plain: bool = False) -> Optional[str]:
+        # Atomically point the collection_name alias at target_collection; returns the collection it
+        # pointed at before (None if there was none). Searches see either the old or the new collection.
+        # A plain collection named collection_name (created before aliases were used) is only replaced
+        # with replace_plain: it has to be deleted first, so searches fail briefly and there is no rollback.
+        previous = self.resolve_collection()
+        if previous == target_collection:
+            return previous
+        
+        operations = []
+        if previous != self.collection_name:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name)))
+        else:
+            collection_names = [col.name for col in self.client.get_collections().collections]
+            if self.collection_name in collection_names:
+                if not replace_plain:
+                    raise ValueError(f"{self.collection_name} is a plain collection, not an alias. Switching "
+                                     f"deletes it (brief search outage, no rollback); pass replace_plain to do so.")
+                self.logger.warning(f"Deleting plain collection {self.collection_name} to replace it with an alias")
+                self.client.delete_collection(self.collection_name)
+            previous = None
+        operations.append(CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=target_collection, alias_name=self.collection_name)
+        ))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        # The alias may now lead to a collection with a different vector layout
+        self._ensured_collections.pop(self._ensured_key, None)
+        
+        self.logger.info(f"Alias {self.collection_name} now points to {target_collection} (was {previous})")
+        return previous
+    
+    def iter_job_ids(self, batch_size: int = 1024):
+        # Stream the job_id payload of every point, batch_size per scroll request
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=["job_id"],
+                with_vectors=False
+            )
+            job_ids = [point.payload["job_id"] for point in points if (point.payload or {}).get("job_id")]
+            if job_ids:
+                yield job_ids
+            if offset is None:
+                return
+    
+    def count_points(self) -> int:
+        return self.client.count(collection_name=self.collection_name, exact=True).count
+    
+    def ensure_payload_indexes(self, existing: Optional[set] = None):
+        # Keyword indexes let Qdrant apply filters during HNSW traversal instead of post-filtering.
+        # existing: fields already indexed (the collection's payload_schema), skipped here.
+        if self.local_mode:
+            return  # the embedded engine has no payload indexes and always filters by scanning
+        for field in ("job_id",) + self.FILTER_FIELDS:
+            if existing and field in existing:
+                continue
+            try:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+            except Exception as e:
+                self.logger.warning(f"Could not create payload index on {field}: {e}")
+    
+    def _build_filter(self, filters: Optional[Union[Dict[str, Any], Filter]]) -> Optional[Filter]:
+        # {"job_domain": "Data Science", "required_skills": ["Python", "SQL"]}:
+        # scalar values must match exactly, lists match any of the given values; fields are ANDed
+        if filters is None or isinstance(filters, Filter):
+            return filters
+        
+        conditions = []
+        for field, value in filters.items():
+            if field not in self.FILTER_FIELDS:
+                raise ValueError(f"Cannot filter on '{field}'. Filterable fields: {list(self.FILTER_FIELDS)}")
+            if value is None or value == "" or value == []:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(FieldCondition(key=field, match=MatchAny(any=list(value))))
+            else:
+                conditions.append(FieldCondition(key=field, match=MatchValue(value=value)))
+        return Filter(must=conditions) if conditions else None
+    
+    @staticmethod
+    def point_id_for(job_id: str) -> str:
+        # Deterministic point ID: re-ingesting a job overwrites its point instead of duplicating it
+        return str(uuid.uuid5(JOB_POINT_NAMESPACE, str(job_id)))
+    
+    @staticmethod
+    def _to_client_vector(vector: Union[np.ndarray, List[float]]) -> List[float]:
+        # Embeddings travel as float32 arrays; qdrant-client models want plain floats, so convert only here
+        return np.asarray(vector, dtype=np.float32).ravel().tolist()
+    
+    def _point_vector(self,
+                      embedding: Union[np.ndarray, List[float]],
+                      section_embeddings: Optional[Dict[str, np.ndarray]] = None,
+                      job_data: Optional[Dict[str, Any]] = None):
+        if not self.named_vectors and not self.sparse_vectors:
+            return self._to_client_vector(embedding)
+        
+        # "" is the unnamed dense vector when it sits next to a sparse one
+        vector = {self.FULL_VECTOR if self.named_vectors else "": self._to_client_vector(embedding)}
+        for name, section_vector in (section_embeddings or {}).items() if self.named_vectors else ():
+            # Empty sections arrive as zero vectors, which cosine distance cannot score; leave them out
+            if name in self.SECTION_VECTORS and np.any(section_vector):
+                vector[name] = self._to_client_vector(section_vector)
+        if self.sparse_vectors and job_data is not None:
+            indices, values = self.sparse_encoder.encode_document(self._sparse_text(job_data))
+            if indices:
+                vector[self.SPARSE_VECTOR] = SparseVector(indices=indices, values=values)
+        return vector
+    
+    def _sparse_text(self, job_data: Dict[str, Any]) -> str:
+        parts = []
+        for field in self.SPARSE_TEXT_FIELDS:
+            value = job_data.get(field)
+            if isinstance(value, list):
+                parts.extend(str(item) for item in value)
+            elif value:
+                parts.append(str(value))
+        return "\n".join(parts)
+    
+    def _build_point(self,
+                     job_data: Dict[str, Any],
+                     embedding: Union[np.ndarray, List[float]],
+                     job_id: str,
+                     section_embeddings: Optional[Dict[str, np.ndarray]] = None) -> PointStruct:
+        # Validate embedding dimension
+        if len(embedding) != self.vector_size:
+            raise ValueError(f"Embedding dimension mismatch: expected {self.vector_size}, got {len(embedding)}")
+        
+        # Create point with proper field mapping
+        return PointStruct(
+            id=self.point_id_for(job_id),
+            vector=self._point_vector(embedding, section_embeddings, job_data),
+            payload=self._build_payload(job_data, job_id)
+        )
+    
+    def _build_payload(self, job_data: Dict[str, Any], job_id: str) -> Dict[str, Any]:
+        # "slim": job_id + filter fields + company (for the diversity per-company cap); "card": also what a
+        # recommendation card displays, so search can skip Mongo; "full": the original near-complete copy
+        if self.payload_policy in ("slim", "card"):
+            payload = {"job_id": job_id, "company": job_data.get("company", "")}
+            fields = self.FILTER_FIELDS + (self.CARD_FIELDS if self.payload_policy == "card" else ())
+            for field in fields:
+                payload[field] = job_data.get(field, [] if field == "required_skills" else "")
+            return payload
+        
+        return {
+            "job_id": job_id,
+            "title": job_data.get("job_title", ""),  # Fixed: job_title -> title
+            "company": job_data.get("company", ""),
+            "location": job_data.get("location", ""),
+            "department": job_data.get("department", ""),
+            "job_domain": job_data.get("job_domain", ""),  # Added job_domain
+            "experience_level": job_data.get("experience_level", ""),
+            "employment_type": job_data.get("employment_type", ""),
+            "required_skills": job_data.get("required_skills", []),
+            "salary_range": job_data.get("salary_range", ""),
+            "description": job_data.get("description", ""),
+            "summary": job_data.get("summary", ""),
+            "responsibilities": job_data.get("responsibilities", []),
+            "qualifications": job_data.get("qualifications", []),
+            "created_at": str(job_data.get("created_at", "")),
+        }
+    
+    def store_job_vector(self,
+                         job_data: Dict[str, Any],
+                         embedding: Union[np.ndarray, List[float]],
+                         job_id: str,
+                         section_embeddings: Optional[Dict[str, np.ndarray]] = None) -> bool:
         try:
             self.logger.info(f"Storing job vector for job_id: {job_id}")
             
-            # Validate embedding dimension
-            if len(embedding) != self.vector_size:
-                self.logger.error(f"Embedding dimension mismatch: expected {self.vector_size}, got {len(embedding)}")
-                return False
-            
-            # Create point with proper field mapping
-            point = PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embedding,
-                payload={
-                    "job_id": job_id,
-                    "title": job_data.get("job_title", ""),  # Fixed: job_title -> title
-                    "company": job_data.get("company", ""),
-                    "location": job_data.get("location", ""),
-                    "department": job_data.get("department", ""),
-                    "job_domain": job_data.get("job_domain", ""),  # Added job_domain
-                    "experience_level": job_data.get("experience_level", ""),
-                    "employment_type": job_data.get("employment_type", ""),
-                    "required_skills": job_data.get("required_skills", []),
-                    "salary_range": job_data.get("salary_range", ""),
-                    "description": job_data.get("description", ""),
-                    "summary": job_data.get("summary", ""),
-                    "responsibilities": job_data.get("responsibilities", []),
-                    "qualifications": job_data.get("qualifications", []),
-                    "created_at": str(job_data.get("created_at", "")),
-                }
-            )
+            point = self._build_point(job_data, embedding, job_id, section_embeddings)
             
             # Store the point
             self.client.upsert(
@@ -107,17 +496,182 @@ class QdrantHandler:
             self.logger.error(f"Error storing job vector for job_id {job_id}: {e}")
             return False
     
-    def search_similar_jobs(self, query_vector: List[float], limit: int = 10) -> List[str]:
-        try:
-
-            search_results = self.client.search(
+    def _upsert_batches(self,
+                        jobs: List[Dict[str, Any]],
+                        embeddings: Union[np.ndarray, List[List[float]]],
+                        job_ids: List[str],
+                        section_embeddings: Optional[List[Optional[Dict[str, np.ndarray]]]],
+                        batch_size: Optional[int]) -> Tuple[Dict[str, bool], List[List[Tuple[str, PointStruct]]]]:
+        statuses = {job_id: False for job_id in job_ids}
+        batch_size = batch_size or self.upsert_batch_size
+        
+        points = []
+        for i, (job, embedding, job_id) in enumerate(zip(jobs, embeddings, job_ids)):
+            try:
+                sections = section_embeddings[i] if section_embeddings else None
+                points.append((job_id, self._build_point(job, embedding, job_id, sections)))
+            except Exception as e:
+                self.logger.error(f"Skipping job_id {job_id}: {e}")
+        
+        batches = [points[start:start + batch_size] for start in range(0, len(points), batch_size)]
+        if batches:
+            self.logger.info(f"Upserting {len(points)} job vectors in {len(batches)} batches")
+        return statuses, batches
+    
+    def store_job_vectors(self,
+                          jobs: List[Dict[str, Any]],
+                          embeddings: Union[np.ndarray, List[List[float]]],
+                          job_ids: List[str],
+                          section_embeddings: Optional[List[Optional[Dict[str, np.ndarray]]]] = None,
+                          batch_size: Optional[int] = None,
+                          wait: bool = False) -> Dict[str, bool]:
+        # Bulk upsert: points are sent in batches of `batch_size` on parallel workers.
+        # With wait=False every batch but the last is fire-and-forget; the last batch is sent with
+        # wait=True once the others are acknowledged, which acts as a consistency barrier because
+        # Qdrant applies updates in the order they were accepted.
+        # Returns {job_id: stored} for every input job.
+        statuses, batches = self._upsert_batches(jobs, embeddings, job_ids, section_embeddings, batch_size)
+        if not batches:
+            return statuses
+        
+        def upload(batch, wait_for_result):
+            self.client.upsert(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=limit
+                points=[point for _, point in batch],
+                wait=wait_for_result
+            )
+            return batch
+        
+        head, last = batches[:-1], batches[-1]
+        if head:
+            with ThreadPoolExecutor(max_workers=self.upsert_parallel) as executor:
+                futures = {executor.submit(upload, batch, wait): batch for batch in head}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        future.result()
+                        for job_id, _ in batch:
+                            statuses[job_id] = True
+                    except Exception as e:
+                        self.logger.error(f"Error upserting batch of {len(batch)} job vectors: {e}")
+        
+        try:
+            upload(last, True)
+            for job_id, _ in last:
+                statuses[job_id] = True
+        except Exception as e:
+            self.logger.error(f"Error upserting final batch of {len(last)} job vectors: {e}")
+        
+        self.logger.info(f"Stored {sum(statuses.values())}/{len(job_ids)} job vectors")
+        return statuses
+    
+    def _search_hits(self,
+                     query_vector: Union[np.ndarray, List[float]],
+                     limit: int,
+                     section_vectors: Optional[Dict[str, np.ndarray]],
+                     section_weights: Optional[Dict[str, float]],
+                     query_filter: Optional[Filter],
+                     payload_keys: List[str],
+                     query_text: Optional[str] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        # Returns ranked (job_id, score, payload) hits; only payload_keys are fetched from Qdrant.
+        # Section-weighted search takes precedence over hybrid keyword matching.
+        if section_weights and self.named_vectors:
+            return self._search_weighted_sections(query_vector, limit, section_vectors or {}, section_weights, query_filter, payload_keys)
+        
+        response = self.client.query_points(**self._query_kwargs(query_vector, limit, query_filter, payload_keys, query_text))
+        return self._hits(response.points, query_vector)
+    
+    def _hybrid_query(self,
+                      query_vector: Union[np.ndarray, List[float]],
+                      limit: int,
+                      query_filter: Optional[Filter],
+                      query_text: Optional[str]) -> Optional[Dict[str, Any]]:
+        # Dense and sparse candidates are prefetched and fused server-side, so hybrid search is still
+        # one round trip. Returns None (plain dense search) when there is nothing to match on keywords.
+        if not (query_text and self.sparse_vectors):
+            return None
+        indices, values = self.sparse_encoder.encode_query(query_text)
+        if not indices:
+            return None
+        
+        candidates = limit * self.hybrid_candidates_factor
+        prefetch = [
+            Prefetch(query=self._to_client_vector(query_vector), using=self.FULL_VECTOR if self.named_vectors else None,
+                     filter=query_filter, params=self._search_params(), limit=candidates),
+            Prefetch(query=SparseVector(indices=indices, values=values), using=self.SPARSE_VECTOR,
+                     filter=query_filter, limit=candidates),
+        ]
+        if self.hybrid_weights:
+            fusion = RrfQuery(rrf=Rrf(weights=self.hybrid_weights))
+        else:
+            fusion = FusionQuery(fusion=Fusion.DBSF if self.hybrid_fusion == "dbsf" else Fusion.RRF)
+        return {"prefetch": prefetch, "query": fusion}
+    
+    def _query_kwargs(self,
+                      query_vector: Union[np.ndarray, List[float]],
+                      limit: int,
+                      query_filter: Optional[Filter],
+                      payload_keys: List[str],
+                      query_text: Optional[str] = None) -> Dict[str, Any]:
+        kwargs = {
+            "collection_name": self.collection_name,
+            "query_filter": query_filter,
+            "limit": limit,
+            "with_payload": payload_keys,
+        }
+        hybrid = self._hybrid_query(query_vector, limit, query_filter, query_text)
+        if hybrid:
+            # The dense vector comes back so hits can report cosine similarity instead of the fused score
+            kwargs.update(hybrid, with_vectors=[self._dense_vector_name])
+        else:
+            kwargs.update(
+                query=self._to_client_vector(query_vector),
+                using=self.FULL_VECTOR if self.named_vectors else None,
+                search_params=self._search_params(),
             )
+        return kwargs
+    
+    @property
+    def _dense_vector_name(self) -> str:
+        return self.FULL_VECTOR if self.named_vectors else ""
+    
+    def _hits(self,
+              points,
+              query_vector: Optional[Union[np.ndarray, List[float]]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        query = self._unit(query_vector) if query_vector is not None else None
+        return [(point.payload.get("job_id"), self._display_score(point, query), point.payload)
+                for point in points if point.payload and point.payload.get("job_id")]
+    
+    @staticmethod
+    def _unit(vector: Union[np.ndarray, List[float]]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _point_dense_vector(self, point):
+        return point.vector.get(self._dense_vector_name) if isinstance(point.vector, dict) else point.vector
+    
+    def _display_score(self, point, query: Optional[np.ndarray]) -> float:
+        # Fused hybrid scores (RRF/DBSF) only encode rank, roughly 0.01-0.03 for RRF, so they can't be shown
+        # as a match percentage. Hybrid hits keep the fused ranking but report the dense cosine similarity.
+        vector = self._point_dense_vector(point) if point.vector is not None else None
+        if query is None or vector is None:
+            return point.score
+        return float(np.dot(query, self._unit(vector)))
+    
+    def search_similar_jobs(self,
+                            query_vector: Union[np.ndarray, List[float]],
+                            limit: int = 10,
+                            section_vectors: Optional[Dict[str, np.ndarray]] = None,
+                            section_weights: Optional[Dict[str, float]] = None,
+                            filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                            query_text: Optional[str] = None):
+        try:
+            hits = self._search_hits(query_vector, limit, section_vectors, section_weights,
+                                     self._build_filter(filters), ["job_id"], query_text)
 
-            job_ids = [result.payload.get("job_id") for result in search_results if result.payload.get("job_id")]
-            scores = [result.score for result in search_results if result.payload.get("job_id")]
+            job_ids = [job_id for job_id, _, _ in hits]
+            scores = [score for _, score, _ in hits]
 
             self.logger.info(f"Found {len(job_ids)} similar jobs")
             return job_ids, scores
@@ -125,51 +679,301 @@ class QdrantHandler:
 
         except Exception as e:
             self.logger.error(f"Error searching similar jobs: {e}")
+            return [], []
+    
+    def search_job_cards(self,
+                         query_vector: Union[np.ndarray, List[float]],
+                         limit: int = 10,
+                         section_vectors: Optional[Dict[str, np.ndarray]] = None,
+                         section_weights: Optional[Dict[str, float]] = None,
+                         filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                         query_text: Optional[str] = None):
+        # Like search_similar_jobs, but returns display-ready job cards built from the "card" payload.
+        # Cards are shaped like Mongo job documents ("_id", "job_title", ...). A hit stored under a
+        # different payload policy comes back as {"_id": job_id} only; callers should fetch those from Mongo.
+        try:
+            hits = self._search_hits(query_vector, limit, section_vectors, section_weights,
+                                     self._build_filter(filters), ["job_id"] + list(self.CARD_FIELDS), query_text)
+            
+            cards = [self._to_card(job_id, payload) for job_id, _, payload in hits]
+            scores = [score for _, score, _ in hits]
+            
+            self.logger.info(f"Found {len(cards)} similar job cards")
+            return cards, scores
+            
+        except Exception as e:
+            self.logger.error(f"Error searching similar job cards: {e}")
+            return [], []
+    
+    def search_job_candidates(self,
+                              query_vector: Union[np.ndarray, List[float]],
+                              limit: int = 100,
+                              filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                              query_text: Optional[str] = None,
+                              with_cards: bool = False):
+        # Over-fetch for re-ranking: returns (candidates, scores, vectors) where candidates are
+        # {"_id", "company"} dicts (full cards when with_cards and the payload has them) and vectors is
+        # a (n, dim) float32 matrix of the candidates' full-document vectors
+        try:
+            payload_keys = ["job_id", "company"] + (list(self.CARD_FIELDS) if with_cards else [])
+            kwargs = self._query_kwargs(query_vector, limit, self._build_filter(filters), payload_keys, query_text)
+            kwargs["with_vectors"] = [self._dense_vector_name] if (self.named_vectors or self.sparse_vectors) else True
+            points = self.client.query_points(**kwargs).points
+            
+            query = self._unit(query_vector)
+            candidates, scores, rows = [], [], []
+            for point in points:
+                job_id = (point.payload or {}).get("job_id")
+                vector = self._point_dense_vector(point)
+                if not job_id or vector is None:
+                    continue
+                candidate = self._to_card(job_id, point.payload) if with_cards else {"_id": job_id}
+                candidate.setdefault("company", point.payload.get("company"))
+                candidates.append(candidate)
+                scores.append(self._display_score(point, query))
+                rows.append(vector)
+            
+            vectors = np.asarray(rows, dtype=np.float32).reshape(len(rows), self.vector_size)
+            self.logger.info(f"Fetched {len(candidates)} candidate jobs with vectors")
+            return candidates, scores, vectors
+            
+        except Exception as e:
+            self.logger.error(f"Error fetching candidate jobs: {e}")
+            return [], [], np.empty((0, self.vector_size), dtype=np.float32)
+    
+    def _to_card(self, job_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if all(field in payload for field in self.CARD_FIELDS):
+            card = {field: payload[field] for field in self.CARD_FIELDS}
+            card["_id"] = job_id
+            return card
+        return {"_id": job_id}
+    
+    def _search_hits_batch(self,
+                           query_vectors: Union[np.ndarray, List[List[float]]],
+                           limit: int,
+                           query_filter: Optional[Filter],
+                           payload_keys: List[str],
+                           query_texts: Optional[List[Optional[str]]] = None) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        # One query_batch_points round trip per search_batch_size queries; results keep the input order
+        responses = []
+        for requests in self._batch_requests(query_vectors, limit, query_filter, payload_keys, query_texts):
+            responses.extend(self.client.query_batch_points(collection_name=self.collection_name, requests=requests))
+        return [self._hits(response.points, query_vector) for response, query_vector in zip(responses, query_vectors)]
+    
+    def _batch_request(self,
+                       query_vector: Union[np.ndarray, List[float]],
+                       limit: int,
+                       query_filter: Optional[Filter],
+                       payload_keys: List[str],
+                       query_text: Optional[str]) -> QueryRequest:
+        hybrid = self._hybrid_query(query_vector, limit, query_filter, query_text)
+        if hybrid:
+            return QueryRequest(filter=query_filter, limit=limit, with_payload=payload_keys,
+                                with_vector=[self._dense_vector_name], **hybrid)
+        return QueryRequest(
+            query=self._to_client_vector(query_vector),
+            using=self.FULL_VECTOR if self.named_vectors else None,
+            filter=query_filter,
+            params=self._search_params(),
+            limit=limit,
+            with_payload=payload_keys
+        )
+    
+    def _batch_requests(self,
+                        query_vectors: Union[np.ndarray, List[List[float]]],
+                        limit: int,
+                        query_filter: Optional[Filter],
+                        payload_keys: List[str],
+                        query_texts: Optional[List[Optional[str]]] = None) -> List[List[QueryRequest]]:
+        query_texts = query_texts or [None] * len(query_vectors)
+        return [
+            [
+                self._batch_request(vector, limit, query_filter, payload_keys, text)
+                for vector, text in zip(query_vectors[start:start + self.search_batch_size],
+                                        query_texts[start:start + self.search_batch_size])
+            ]
+            for start in range(0, len(query_vectors), self.search_batch_size)
+        ]
+    
+    def search_similar_jobs_batch(self,
+                                  query_vectors: Union[np.ndarray, List[List[float]]],
+                                  limit: int = 10,
+                                  filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                                  query_texts: Optional[List[Optional[str]]] = None) -> List[Tuple[List[str], List[float]]]:
+        # Batched search_similar_jobs: one (job_ids, scores) pair per query vector, in input order
+        try:
+            hits = self._search_hits_batch(query_vectors, limit, self._build_filter(filters), ["job_id"], query_texts)
+            self.logger.info(f"Ran {len(hits)} similar job searches in batch")
+            return [([job_id for job_id, _, _ in row], [score for _, score, _ in row]) for row in hits]
+            
+        except Exception as e:
+            self.logger.error(f"Error batch searching similar jobs: {e}")
             return []
     
+    def search_job_cards_batch(self,
+                               query_vectors: Union[np.ndarray, List[List[float]]],
+                               limit: int = 10,
+                               filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                               query_texts: Optional[List[Optional[str]]] = None) -> List[Tuple[List[Dict[str, Any]], List[float]]]:
+        # Batched search_job_cards: one (cards, scores) pair per query vector, in input order
+        try:
+            hits = self._search_hits_batch(query_vectors, limit, self._build_filter(filters),
+                                           ["job_id"] + list(self.CARD_FIELDS), query_texts)
+            self.logger.info(f"Ran {len(hits)} similar job card searches in batch")
+            return [([self._to_card(job_id, payload) for job_id, _, payload in row], [score for _, score, _ in row])
+                    for row in hits]
+            
+        except Exception as e:
+            self.logger.error(f"Error batch searching similar job cards: {e}")
+            return []
+    
+    def _search_weighted_sections(self,
+                                  query_vector: Union[np.ndarray, List[float]],
+                                  limit: int,
+                                  section_vectors: Dict[str, np.ndarray],
+                                  section_weights: Dict[str, float],
+                                  query_filter: Optional[Filter] = None,
+                                  payload_keys: Optional[List[str]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        # One batched request with a query per weighted named vector, then weighted score fusion.
+        # Scores are divided by the total weight so they stay on the cosine scale.
+        names, requests = self._section_requests(query_vector, limit, section_vectors, section_weights, query_filter, payload_keys)
+        responses = self.client.query_batch_points(collection_name=self.collection_name, requests=requests)
+        return self._fuse_sections(names, responses, section_weights, limit)
+    
+    def _section_requests(self,
+                          query_vector: Union[np.ndarray, List[float]],
+                          limit: int,
+                          section_vectors: Dict[str, np.ndarray],
+                          section_weights: Dict[str, float],
+                          query_filter: Optional[Filter],
+                          payload_keys: Optional[List[str]]) -> Tuple[List[str], List[QueryRequest]]:
+        queries = {self.FULL_VECTOR: query_vector, **section_vectors}
+        names = [name for name, weight in section_weights.items()
+                 if weight > 0 and name in queries and np.any(queries[name])]
+        if not names:
+            raise ValueError(f"No usable vectors for section weights {section_weights}")
+        
+        requests = [
+            QueryRequest(
+                query=self._to_client_vector(queries[name]),
+                using=name,
+                filter=query_filter,
+                params=self._search_params(),
+                limit=limit * self.section_candidates_factor,
+                with_payload=payload_keys or ["job_id"]
+            )
+            for name in names
+        ]
+        return names, requests
+    
+    def _fuse_sections(self,
+                       names: List[str],
+                       responses,
+                       section_weights: Dict[str, float],
+                       limit: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+        total_weight = sum(section_weights[name] for name in names)
+        fused: Dict[str, float] = {}
+        payloads: Dict[str, Dict[str, Any]] = {}
+        for name, response in zip(names, responses):
+            weight = section_weights[name] / total_weight
+            for point in response.points:
+                job_id = (point.payload or {}).get("job_id")
+                if job_id:
+                    fused[job_id] = fused.get(job_id, 0.0) + weight * point.score
+                    payloads[job_id] = point.payload
+        
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+        self.logger.info(f"Found {len(ranked)} similar jobs using sections {names}")
+        return [(job_id, score, payloads[job_id]) for job_id, score in ranked]
+    
     def delete_job_vector(self, job_id: str) -> bool:
         try:
             self.logger.info(f"Deleting job vector for job_id: {job_id}")
             
-            # Search for the point with the job_id
-            search_results = self.client.scroll(
+            # Point IDs are derived from job_id, so the point can be addressed directly
+            self.client.delete(
                 collection_name=self.collection_name,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="job_id",
-                            match=MatchValue(value=job_id)
-                        )
-                    ]
-                ),
-                limit=1
+                points_selector=PointIdsList(points=[self.point_id_for(job_id)])
             )
             
-            if search_results[0]:  # If points found
-                point_id = search_results[0][0].id
-                
-                # Delete the point
-                self.client.delete(
-                    collection_name=self.collection_name,
-                    points_selector=[point_id]
-                )
-                
-                self.logger.info(f"Successfully deleted vector for job_id: {job_id}")
-                return True
-            else:
-                self.logger.warning(f"No vector found for job_id: {job_id}")
-                return False
+            self.logger.info(f"Successfully deleted vector for job_id: {job_id}")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Error deleting vector for job_id {job_id}: {e}")
             return False
     
+    def delete_job_vectors(self, job_ids: List[str]) -> bool:
+        try:
+            if not job_ids:
+                return True
+            self.logger.info(f"Deleting {len(job_ids)} job vectors")
+            
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=[self.point_id_for(job_id) for job_id in job_ids])
+            )
+            
+            self.logger.info(f"Successfully deleted {len(job_ids)} job vectors")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error deleting job vectors: {e}")
+            return False
+    
+    def migrate_to_deterministic_ids(self, batch_size: int = 256) -> Dict[str, int]:
+        # One-off migration for collections written before point IDs were derived from job_id.
+        # Every point whose ID is not point_id_for(job_id) is re-upserted under the deterministic ID
+        # (vectors and payload unchanged) and the old point is deleted. Duplicate vectors for the
+        # same job collapse into one point. Safe to re-run: already-migrated points are skipped.
+        counts = {"scanned": 0, "migrated": 0, "skipped": 0}
+        offset = None
+        
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            counts["scanned"] += len(points)
+            
+            moved, old_ids = [], []
+            for point in points:
+                job_id = (point.payload or {}).get("job_id")
+                if not job_id:
+                    counts["skipped"] += 1
+                    continue
+                new_id = self.point_id_for(job_id)
+                if str(point.id) == new_id:
+                    continue
+                moved.append(PointStruct(id=new_id, vector=point.vector, payload=point.payload))
+                old_ids.append(point.id)
+            
+            if moved:
+                # Write the new points before removing the old ones so no job is ever missing
+                self.client.upsert(collection_name=self.collection_name, points=moved, wait=True)
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=PointIdsList(points=old_ids),
+                    wait=True
+                )
+                counts["migrated"] += len(moved)
+            
+            if offset is None:
+                break
+        
+        self.logger.info(f"Point ID migration finished: {counts}")
+        return counts
+    
     def get_collection_info(self) -> Dict[str, Any]:
         try:
             info = self.client.get_collection(self.collection_name)
             return {
                 "points_count": info.points_count,
-                "vectors_count": info.vectors_count,
+                # Dropped from CollectionInfo in newer qdrant-client releases
+                "vectors_count": getattr(info, "vectors_count", None),
                 "status": info.status
             }
         except Exception as e:
@@ -177,10 +981,246 @@ class QdrantHandler:
             return {}
     
     def delete_collection(self) -> bool:
+        # collection_name is usually an alias: drop the alias and the collection behind it
+        try:
+            physical = self.resolve_collection()
+            if physical not in [col.name for col in self.client.get_collections().collections]:
+                self.logger.error(f"Collection {physical} does not exist")
+                return False
+            if physical != self.collection_name:
+                self.client.update_collection_aliases(change_aliases_operations=[
+                    DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name))
+                ])
+            deleted = self.client.delete_collection(physical)
+            self._ensured_collections.pop(self._ensured_key, None)
+            if not deleted:
+                self.logger.error(f"Collection {physical} was not deleted")
+                return False
+            self.logger.info(f"Deleted collection: {physical} (alias {self.collection_name})"
+                             if physical != self.collection_name else f"Deleted collection: {physical}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting collection: {e}")
+            return False
+    
+    # --- async variants ----------------------------------------------------
+    # Same behaviour and return values as the sync methods. Remote connections use an
+    # AsyncQdrantClient (one per event loop, same REST/gRPC settings); the embedded engine cannot be
+    # opened twice, so in local mode the sync client runs on a worker thread instead.
+    
+    def _get_async_client(self) -> Optional[AsyncQdrantClient]:
+        if self.local_mode or not self._client_kwargs:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncQdrantClient(**self._client_kwargs)
+            self._async_clients[loop] = client
+        return client
+    
+    async def _acall(self, method: str, **kwargs):
+        client = self._get_async_client()
+        if client is None:
+            return await asyncio.to_thread(getattr(self.client, method), **kwargs)
+        return await getattr(client, method)(**kwargs)
+    
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+    
+    async def astore_job_vector(self,
+                                job_data: Dict[str, Any],
+                                embedding: Union[np.ndarray, List[float]],
+                                job_id: str,
+                                section_embeddings: Optional[Dict[str, np.ndarray]] = None) -> bool:
+        try:
+            point = self._build_point(job_data, embedding, job_id, section_embeddings)
+            await self._acall("upsert", collection_name=self.collection_name, points=[point])
+            self.logger.info(f"Successfully stored job vector for job_id: {job_id}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error storing job vector for job_id {job_id}: {e}")
+            return False
+    
+    async def astore_job_vectors(self,
+                                 jobs: List[Dict[str, Any]],
+                                 embeddings: Union[np.ndarray, List[List[float]]],
+                                 job_ids: List[str],
+                                 section_embeddings: Optional[List[Optional[Dict[str, np.ndarray]]]] = None,
+                                 batch_size: Optional[int] = None,
+                                 wait: bool = False) -> Dict[str, bool]:
+        statuses, batches = self._upsert_batches(jobs, embeddings, job_ids, section_embeddings, batch_size)
+        if not batches:
+            return statuses
+        
+        semaphore = asyncio.Semaphore(self.upsert_parallel)
+        
+        async def upload(batch, wait_for_result):
+            async with semaphore:
+                try:
+                    await self._acall("upsert", collection_name=self.collection_name,
+                                      points=[point for _, point in batch], wait=wait_for_result)
+                    for job_id, _ in batch:
+                        statuses[job_id] = True
+                except Exception as e:
+                    self.logger.error(f"Error upserting batch of {len(batch)} job vectors: {e}")
+        
+        # Same barrier as store_job_vectors: the last batch waits only after the others are acknowledged
+        await asyncio.gather(*(upload(batch, wait) for batch in batches[:-1]))
+        await upload(batches[-1], True)
+        
+        self.logger.info(f"Stored {sum(statuses.values())}/{len(job_ids)} job vectors")
+        return statuses
+    
+    async def _asearch_hits(self,
+                            query_vector: Union[np.ndarray, List[float]],
+                            limit: int,
+                            section_vectors: Optional[Dict[str, np.ndarray]],
+                            section_weights: Optional[Dict[str, float]],
+                            query_filter: Optional[Filter],
+                            payload_keys: List[str],
+                            query_text: Optional[str] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        if section_weights and self.named_vectors:
+            names, requests = self._section_requests(query_vector, limit, section_vectors or {}, section_weights,
+                                                     query_filter, payload_keys)
+            responses = await self._acall("query_batch_points", collection_name=self.collection_name, requests=requests)
+            return self._fuse_sections(names, responses, section_weights, limit)
+        
+        response = await self._acall("query_points", **self._query_kwargs(query_vector, limit, query_filter, payload_keys, query_text))
+        return self._hits(response.points, query_vector)
+    
+    async def _asearch_hits_batch(self,
+                                  query_vectors: Union[np.ndarray, List[List[float]]],
+                                  limit: int,
+                                  query_filter: Optional[Filter],
+                                  payload_keys: List[str],
+                                  query_texts: Optional[List[Optional[str]]] = None) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        # Chunks go out concurrently; gather keeps them in input order
+        chunks = await asyncio.gather(*(
+            self._acall("query_batch_points", collection_name=self.collection_name, requests=requests)
+            for requests in self._batch_requests(query_vectors, limit, query_filter, payload_keys, query_texts)
+        ))
+        responses = [response for chunk in chunks for response in chunk]
+        return [self._hits(response.points, query_vector) for response, query_vector in zip(responses, query_vectors)]
+    
+    async def asearch_similar_jobs(self,
+                                   query_vector: Union[np.ndarray, List[float]],
+                                   limit: int = 10,
+                                   section_vectors: Optional[Dict[str, np.ndarray]] = None,
+                                   section_weights: Optional[Dict[str, float]] = None,
+                                   filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                                   query_text: Optional[str] = None):
+        try:
+            hits = await self._asearch_hits(query_vector, limit, section_vectors, section_weights,
+                                            self._build_filter(filters), ["job_id"], query_text)
+            self.logger.info(f"Found {len(hits)} similar jobs")
+            return [job_id for job_id, _, _ in hits], [score for _, score, _ in hits]
+            
+        except Exception as e:
+            self.logger.error(f"Error searching similar jobs: {e}")
+            return [], []
+    
+    async def asearch_job_cards(self,
+                                query_vector: Union[np.ndarray, List[float]],
+                                limit: int = 10,
+                                section_vectors: Optional[Dict[str, np.ndarray]] = None,
+                                section_weights: Optional[Dict[str, float]] = None,
+                                filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                                query_text: Optional[str] = None):
+        try:
+            hits = await self._asearch_hits(query_vector, limit, section_vectors, section_weights,
+                                            self._build_filter(filters), ["job_id"] + list(self.CARD_FIELDS), query_text)
+            self.logger.info(f"Found {len(hits)} similar job cards")
+            return [self._to_card(job_id, payload) for job_id, _, payload in hits], [score for _, score, _ in hits]
+            
+        except Exception as e:
+            self.logger.error(f"Error searching similar job cards: {e}")
+            return [], []
+    
+    async def asearch_similar_jobs_batch(self,
+                                         query_vectors: Union[np.ndarray, List[List[float]]],
+                                         limit: int = 10,
+                                         filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                                         query_texts: Optional[List[Optional[str]]] = None) -> List[Tuple[List[str], List[float]]]:
+        try:
+            hits = await self._asearch_hits_batch(query_vectors, limit, self._build_filter(filters), ["job_id"], query_texts)
+            self.logger.info(f"Ran {len(hits)} similar job searches in batch")
+            return [([job_id for job_id, _, _ in row], [score for _, score, _ in row]) for row in hits]
+            
+        except Exception as e:
+            self.logger.error(f"Error batch searching similar jobs: {e}")
+            return []
+    
+    async def asearch_job_cards_batch(self,
+                                      query_vectors: Union[np.ndarray, List[List[float]]],
+                                      limit: int = 10,
+                                      filters: Optional[Union[Dict[str, Any], Filter]] = None,
+                                      query_texts: Optional[List[Optional[str]]] = None) -> List[Tuple[List[Dict[str, Any]], List[float]]]:
+        try:
+            hits = await self._asearch_hits_batch(query_vectors, limit, self._build_filter(filters),
+                                                  ["job_id"] + list(self.CARD_FIELDS), query_texts)
+            self.logger.info(f"Ran {len(hits)} similar job card searches in batch")
+            return [([self._to_card(job_id, payload) for job_id, _, payload in row], [score for _, score, _ in row])
+                    for row in hits]
+            
+        except Exception as e:
+            self.logger.error(f"Error batch searching similar job cards: {e}")
+            return []
+    
+    async def adelete_job_vector(self, job_id: str) -> bool:
+        return await self.adelete_job_vectors([job_id])
+    
+    async def adelete_job_vectors(self, job_ids: List[str]) -> bool:
+        try:
+            if not job_ids:
+                return True
+            await self._acall(
+                "delete",
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=[self.point_id_for(job_id) for job_id in job_ids])
+            )
+            self.logger.info(f"Successfully deleted {len(job_ids)} job vectors")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error deleting job vectors: {e}")
+            return False
+    
+    async def aget_collection_info(self) -> Dict[str, Any]:
         try:
-            self.client.delete_collection(self.collection_name)
-            self.logger.info(f"Deleted collection: {self.collection_name}")
+            info = await self._acall("get_collection", collection_name=self.collection_name)
+            return {
+                "points_count": info.points_count,
+                # Dropped from CollectionInfo in newer qdrant-client releases
+                "vectors_count": getattr(info, "vectors_count", None),
+                "status": info.status
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting collection info: {e}")
+            return {}
+    
+    async def adelete_collection(self) -> bool:
+        try:
+            aliases = (await self._acall("get_aliases")).aliases
+            physical = next((alias.collection_name for alias in aliases if alias.alias_name == self.collection_name),
+                            self.collection_name)
+            if physical not in [col.name for col in (await self._acall("get_collections")).collections]:
+                self.logger.error(f"Collection {physical} does not exist")
+                return False
+            if physical != self.collection_name:
+                await self._acall("update_collection_aliases", change_aliases_operations=[
+                    DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name))
+                ])
+            deleted = await self._acall("delete_collection", collection_name=physical)
+            self._ensured_collections.pop(self._ensured_key, None)
+            if not deleted:
+                self.logger.error(f"Collection {physical} was not deleted")
+                return False
+            self.logger.info(f"Deleted collection: {physical} (alias {self.collection_name})"
+                             if physical != self.collection_name else f"Deleted collection: {physical}")
             return True
         except Exception as e:
             self.logger.error(f"Error deleting collection: {e}")
-            return False
\ No newline at end of file
+            return False
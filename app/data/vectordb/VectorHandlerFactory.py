@@ -0,0 +1,28 @@
+import os
+from typing import Dict, Type
+import streamlit as st
+from .QdrantClient import QdrantHandler
+from .NumpyIndex import NumpyIndexHandler
+
+
+class VectorHandlerFactory:
+
+    _handlers: Dict[str, Type] = {
+        "qdrant": QdrantHandler,
+        "numpy": NumpyIndexHandler,
+    }
+
+    @classmethod
+    def register_handler(cls, store_name: str, handler_class: Type):
+        cls._handlers[store_name.lower()] = handler_class
+
+    @classmethod
+    def create_handler(cls, store_name: str = None, **kwargs):
+        # VECTOR_STORE picks the job vector store: "qdrant" (default) or "numpy" for the in-process index
+        store_name = (store_name or os.getenv("VECTOR_STORE") or st.secrets.get("VECTOR_STORE") or "qdrant").lower()
+
+        if store_name not in cls._handlers:
+            raise ValueError(f"Vector store '{store_name}' is not registered. "
+                             f"Available stores: {list(cls._handlers.keys())}")
+
+        return cls._handlers[store_name](**kwargs)
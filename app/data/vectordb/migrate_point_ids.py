@@ -0,0 +1,26 @@
+"""
+One-off migration: rewrite points in the jobs collection to deterministic IDs derived from job_id.
+
+Run from the app directory:
+    python -m data.vectordb.migrate_point_ids
+"""
+import logging
+from dotenv import load_dotenv
+
+from data.vectordb.QdrantClient import QdrantHandler
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    handler = QdrantHandler()
+    if handler.client is None:
+        raise SystemExit("Could not connect to Qdrant. Check QDRANT_URL / QDRANT_API_KEY.")
+
+    counts = handler.migrate_to_deterministic_ids()
+    print(f"Scanned {counts['scanned']} points, migrated {counts['migrated']}, skipped {counts['skipped']} without job_id")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import os
+import time
 import streamlit as st
 from typing import Dict, Any, Optional
 from .LLMFactory import LLMFactory
 from .clients.GroqClient import GroqClient
 from .prompts.PromptTemplates import PromptTemplates
 from services.ResponseHandler import ResponseHandler
+from services.RateLimitController import AdaptiveRateController
 
 
 class LLMProcessor:
@@ -14,6 +17,13 @@ class LLMProcessor:
         self.prompts = PromptTemplates()
         self.response_handler = ResponseHandler()
         self.llm = None
+        # Shared across sessions so every Groq call in the process backs off together on 429/503
+        self.rate_controller = AdaptiveRateController.for_provider(
+            'llm:groq',
+            initial_limit=int(os.getenv('GROQ_MAX_CONCURRENCY') or st.secrets.get('GROQ_MAX_CONCURRENCY') or 2),
+            max_limit=int(os.getenv('GROQ_MAX_CONCURRENCY_CEILING') or st.secrets.get('GROQ_MAX_CONCURRENCY_CEILING') or 8)
+        )
+        self.max_throttle_retries = int(os.getenv('GROQ_MAX_THROTTLE_RETRIES') or st.secrets.get('GROQ_MAX_THROTTLE_RETRIES') or 5)
         
     def _initialize_llm(self):
         if self.llm is None:
@@ -24,6 +34,20 @@ class LLMProcessor:
                 return False
         return True
     
+    def _invoke(self, prompt):
+        # Invoke the LLM under the shared rate controller, retrying only when the provider throttles us
+        for attempt in range(self.max_throttle_retries + 1):
+            try:
+                with self.rate_controller.slot():
+                    response = self.llm.invoke(prompt)
+                self.rate_controller.on_success()
+                return response
+            except Exception as e:
+                throttled = self.rate_controller.on_error(e)
+                if not throttled or attempt == self.max_throttle_retries:
+                    raise
+                time.sleep(self.rate_controller.backoff_delay(attempt, e))
+    
     def structure_resume_data(self, resume_text: str) -> Optional[Dict[str, Any]]:
         
         if not self._initialize_llm():
@@ -34,7 +58,7 @@ class LLMProcessor:
         
         try:
             # Use the Groq client to process the resume
-            response = self.llm.invoke(prompt)
+            response = self._invoke(prompt)
             
             # Extract the JSON from the response
             parsed_data = self.response_handler._parse_llm_response(response)
@@ -54,7 +78,7 @@ class LLMProcessor:
         prompt = self.prompts.job_generator_prompt(job_num, job_domain)
         
         try:
-            response = self.llm.invoke(prompt)
+            response = self._invoke(prompt)
             
             parsed_data = self.response_handler._parse_llm_response(response)
             structured_data = self.response_handler._validate_and_clean_jd(parsed_data)
@@ -72,7 +96,7 @@ class LLMProcessor:
         prompt = self.prompts.job_extraction_prompt(job_desc)
         
         try:
-            response = self.llm.invoke(prompt)
+            response = self._invoke(prompt)
             
             parsed_data = self.response_handler._parse_llm_response(response)
             structured_data = self.response_handler._validate_and_clean_jd(parsed_data)
@@ -1,6 +1,6 @@
 from data.mongodb.MongoClient import MongoDBHandler
 from data.embeddings.EmbeddingHandler import EmbeddingHandler
-from data.vectordb.QdrantClient import QdrantHandler
+from data.vectordb.VectorHandlerFactory import VectorHandlerFactory
 import logging
 from typing import List, Dict, Any, Optional, Union
 
@@ -9,7 +9,7 @@ class JobPipeline:
     def __init__(self):
         self.mongo_handler = MongoDBHandler()
         self.embedding_handler = EmbeddingHandler()
-        self.vector_handler = QdrantHandler()
+        self.vector_handler = VectorHandlerFactory.create_handler()
         
         # Set up logging
         logging.basicConfig(level=logging.INFO)
@@ -50,38 +50,54 @@ class JobPipeline:
 
             self.logger.info(f"Stored {len(job_ids)} jobs in MongoDB with IDs: {job_ids}")
 
-            # Step 2: Generate embeddings per job to maintain alignment
-            self.logger.info("Generating embeddings for each job...")
-            embeddings = []
+            # Step 2: Generate embeddings for all jobs in one batched call
+            self.logger.info("Generating embeddings for all jobs...")
+            embeddings = None
             
-            for i, job in enumerate(jobs):
-                try:
-                    self.logger.info(f"Processing job {i+1}/{job_count}: {job.get('job_title', 'No title')}")
+            try:
+                embedding_matrix = self.embedding_handler.get_job_embeddings(jobs)
+                if len(embedding_matrix) != job_count:
+                    # Some jobs had no usable text, so positions no longer line up with job_ids
+                    self.logger.warning(f"Batched embedding returned {len(embedding_matrix)} of {job_count}, falling back to per-job embedding")
+                else:
+                    # Rows are float32 views into one contiguous matrix, no per-job copies
+                    embeddings = list(embedding_matrix)
+                    self.logger.info(f"✓ Generated {len(embeddings)} embeddings in one batch ({embedding_matrix.nbytes} bytes)")
+                    self.logger.info(f"Embedding throughput: {self.embedding_handler.get_throughput_stats()}")
+            except Exception as e:
+                self.logger.error(f"✗ Batched embedding failed, falling back to per-job embedding: {e}")
+            
+            # Fallback: embed per job to maintain alignment
+            if embeddings is None:
+                embeddings = []
+                for i, job in enumerate(jobs):
+                    try:
+                        self.logger.info(f"Processing job {i+1}/{job_count}: {job.get('job_title', 'No title')}")
                     
-                    # DEBUG: Check job structure before embedding
-                    self.logger.info(f"DEBUG: Job {i+1} keys: {list(job.keys())}")
+                        # DEBUG: Check job structure before embedding
+                        self.logger.info(f"DEBUG: Job {i+1} keys: {list(job.keys())}")
                     
-                    # Pass single job as a list (since get_job_embeddings expects List[dict])
-                    # and get back a list with one embedding
-                    job_embeddings = self.embedding_handler.get_job_embeddings([job])
+                        # Pass single job as a list (since get_job_embeddings expects List[dict])
+                        # and get back a list with one embedding
+                        job_embeddings = self.embedding_handler.get_job_embeddings([job])
                     
-                    if job_embeddings and len(job_embeddings) > 0:
-                        # Extract the single embedding from the list
-                        embedding = job_embeddings[0]
-                        embeddings.append(embedding)
-                        self.logger.info(f"✓ Generated embedding for job {i+1}/{job_count} - dimension: {len(embedding)}")
+                        if job_embeddings is not None and len(job_embeddings) > 0:
+                            # Extract the single embedding from the list
+                            embedding = job_embeddings[0]
+                            embeddings.append(embedding)
+                            self.logger.info(f"✓ Generated embedding for job {i+1}/{job_count} - dimension: {len(embedding)}")
                         
-                        # DEBUG: Check embedding type and first few values
-                        self.logger.info(f"DEBUG: Embedding type: {type(embedding)}, first 3 values: {embedding[:3]}")
-                    else:
-                        self.logger.error(f"✗ Failed to generate embedding for job {i+1}/{job_count}")
+                            # DEBUG: Check embedding type and first few values
+                            self.logger.info(f"DEBUG: Embedding type: {type(embedding)}, first 3 values: {embedding[:3]}")
+                        else:
+                            self.logger.error(f"✗ Failed to generate embedding for job {i+1}/{job_count}")
+                            # Add None to maintain alignment
+                            embeddings.append(None)
+                        
+                    except Exception as e:
+                        self.logger.error(f"✗ Error generating embedding for job {i+1}: {e}")
                         # Add None to maintain alignment
                         embeddings.append(None)
-                        
-                except Exception as e:
-                    self.logger.error(f"✗ Error generating embedding for job {i+1}: {e}")
-                    # Add None to maintain alignment
-                    embeddings.append(None)
 
             # Filter out None embeddings and corresponding jobs/job_ids
             valid_data = []
@@ -97,46 +113,46 @@ class JobPipeline:
 
             self.logger.info(f"Generated {len(valid_data)} valid embeddings out of {job_count} jobs")
 
-            # Step 3: Store vectors in Qdrant
+            # Step 2b: Section embeddings (skills / experience / summary) for collections with named vectors
+            job_sections = {}
+            if self.vector_handler.named_vectors:
+                try:
+                    section_matrices = self.embedding_handler.get_job_section_embeddings(jobs)
+                    for i, job_id in enumerate(job_ids):
+                        job_sections[job_id] = {name: matrix[i] for name, matrix in section_matrices.items()}
+                    self.logger.info(f"✓ Generated section embeddings for {len(job_sections)} jobs")
+                except Exception as e:
+                    # Jobs are still stored with their full vector; section search just won't match them
+                    self.logger.error(f"✗ Failed to generate section embeddings: {e}")
+
+            # Step 3: Store vectors in Qdrant (batched bulk upsert)
             self.logger.info("Storing vectors in Qdrant...")
             vector_results = []
             successful_jobs = []
 
-            # Process each valid job, embedding, job_id tuple
-            for i, (job, embedding, job_id) in enumerate(valid_data):
-                try:
-                    self.logger.info(f"Storing vector for job {i+1}/{len(valid_data)}: {job.get('job_title', 'No title')} (ID: {job_id})")
-                    
-                    # DEBUG: Check data before storing
-                    self.logger.info(f"DEBUG: Job ID type: {type(job_id)}, value: {job_id}")
-                    self.logger.info(f"DEBUG: Embedding type: {type(embedding)}, length: {len(embedding)}")
-                    self.logger.info(f"DEBUG: Job data keys: {list(job.keys())}")
-                    
-                    # Check if vector handler is properly initialized
-                    if self.vector_handler.client is None:
-                        self.logger.error("Vector handler client is None - connection failed")
-                        vector_results.append(False)
-                        continue
-                    
-                    success = self.vector_handler.store_job_vector(
-                        job_data=job,
-                        embedding=embedding,
-                        job_id=job_id
-                    )
-                    
+            # Check if vector handler is properly initialized
+            if not self.vector_handler.is_connected():
+                self.logger.error("Vector handler client is None - connection failed")
+                vector_results = [False] * len(valid_data)
+            else:
+                valid_jobs = [job for job, _, _ in valid_data]
+                valid_embeddings = [embedding for _, embedding, _ in valid_data]
+                valid_ids = [job_id for _, _, job_id in valid_data]
+
+                statuses = self.vector_handler.store_job_vectors(
+                    jobs=valid_jobs,
+                    embeddings=valid_embeddings,
+                    job_ids=valid_ids,
+                    section_embeddings=[job_sections.get(job_id) for job_id in valid_ids] if job_sections else None
+                )
+
+                for i, job_id in enumerate(valid_ids):
+                    success = statuses.get(job_id, False)
                     vector_results.append(success)
-                    
                     if success:
                         successful_jobs.append(job_id)
-                        self.logger.info(f"✓ Stored vector for job {i+1}/{len(valid_data)}")
                     else:
-                        self.logger.error(f"✗ Failed to store vector for job {i+1}/{len(valid_data)}")
-
-                except Exception as e:
-                    self.logger.error(f"✗ Error storing vector for job {i+1}: {e}")
-                    import traceback
-                    self.logger.error(f"Traceback: {traceback.format_exc()}")
-                    vector_results.append(False)
+                        self.logger.error(f"✗ Failed to store vector for job {i+1}/{len(valid_data)} (ID: {job_id})")
 
             successful_vectors = sum(vector_results)
             self.logger.info(f"Successfully stored {successful_vectors}/{len(valid_data)} vectors")
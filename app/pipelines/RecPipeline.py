@@ -1,37 +1,95 @@
 from data.mongodb.MongoClient import MongoDBHandler
 from data.embeddings.EmbeddingHandler import EmbeddingHandler
-from data.vectordb.QdrantClient import QdrantHandler
-from typing import Dict, Any
+from data.vectordb.VectorHandlerFactory import VectorHandlerFactory
+from services.DiversityReranker import DiversityReranker
+from typing import Dict, Any, List, Optional, Union
 import logging
 
 class RecommendationsPipeline:
+    
+    # Job fields the recommendation cards and PDF export show; everything else stays in MongoDB
+    JOB_FIELDS = ["job_title", "company", "location", "job_domain", "experience_level", "employment_type",
+                  "salary_range", "required_skills", "summary"]
+    
     def __init__(self):
         self.mongo_handler = MongoDBHandler()
         self.embedding_handler = EmbeddingHandler()
-        self.vector_handler = QdrantHandler()
+        self.vector_handler = VectorHandlerFactory.create_handler()
         
         # Set up logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-    def search_jobs_pipeline(self, resume_text: str, limit: int = 10) -> Dict[str, Any]:
+    def search_jobs_pipeline(self,
+                             resume_text: str,
+                             limit: int = 10,
+                             section_weights: Optional[Dict[str, float]] = None,
+                             filters: Optional[Dict[str, Any]] = None,
+                             mmr_lambda: Optional[float] = None,
+                             max_per_company: Optional[int] = None,
+                             candidate_limit: Optional[int] = None) -> Dict[str, Any]:
+        # section_weights, e.g. {"skills": 0.6, "experience": 0.3, "full": 0.1}, ranks by a weighted
+        # mix of per-section similarities when the collection stores named section vectors.
+        # filters, e.g. {"job_domain": "Data Science", "experience_level": ["Mid", "Senior"]},
+        # restrict candidates inside the vector search (see QdrantHandler.FILTER_FIELDS)
+        # mmr_lambda (1.0 = pure relevance, lower = more diverse) and/or max_per_company turn on
+        # diversity re-ranking of candidate_limit over-fetched candidates (default 10x limit, at most 200).
+        # The candidate pool comes from the full-document vector, so section_weights don't apply there.
         try:
             self.logger.info("Starting job search pipeline")
             
             # Step 1: Generate resume embedding
             resume_embedding = self.embedding_handler.get_resume_embedding(resume_text)
             
-            if not resume_embedding:
+            if resume_embedding is None or len(resume_embedding) == 0:
                 self.logger.error("Failed to generate resume embedding")
                 return {"success": False, "error": "Failed to generate resume embedding"}
             
             self.logger.info(f"Generated resume embedding with dimension: {len(resume_embedding)}")
             
+            section_vectors = None
+            if section_weights and self.vector_handler.named_vectors:
+                section_vectors = self.embedding_handler.get_resume_section_embeddings(resume_text)
+            
             # Step 2: Search similar jobs
-            search_results, score = self.vector_handler.search_similar_jobs(
+            # With sparse vectors, exact keywords (e.g. skill names) in the resume also rank jobs
+            query_text = self.embedding_handler.get_resume_text(resume_text) if self.vector_handler.sparse_vectors else None
+            search_kwargs = dict(
                 query_vector=resume_embedding,
                 limit=limit,
+                section_vectors=section_vectors,
+                section_weights=section_weights,
+                filters=filters,
+                query_text=query_text,
             )
+            if mmr_lambda is not None or max_per_company:
+                card_mode = self.vector_handler.payload_policy == "card"
+                candidates, candidate_scores, candidate_vectors = self.vector_handler.search_job_candidates(
+                    query_vector=resume_embedding,
+                    limit=candidate_limit or min(200, max(limit * 10, 50)),
+                    filters=filters,
+                    query_text=query_text,
+                    with_cards=card_mode,
+                )
+                picks = DiversityReranker.mmr(
+                    resume_embedding,
+                    candidate_vectors,
+                    k=limit,
+                    mmr_lambda=1.0 if mmr_lambda is None else mmr_lambda,
+                    companies=[candidate.get("company") for candidate in candidates],
+                    max_per_company=max_per_company,
+                )
+                self.logger.info(f"Diversity re-ranking kept {len(picks)} of {len(candidates)} candidates")
+                cards = [candidates[i] for i in picks] if card_mode else None
+                search_results = [candidates[i]["_id"] for i in picks]
+                score = [candidate_scores[i] for i in picks]
+            elif self.vector_handler.payload_policy == "card":
+                # Cards come straight from the Qdrant payload, Mongo is only hit for points without one
+                cards, score = self.vector_handler.search_job_cards(**search_kwargs)
+                search_results = [card["_id"] for card in cards]
+            else:
+                cards = None
+                search_results, score = self.vector_handler.search_similar_jobs(**search_kwargs)
             
             if not search_results:
                 self.logger.info("No similar jobs found")
@@ -45,16 +103,20 @@ class RecommendationsPipeline:
             
             self.logger.info(f"Found {len(job_ids)} similar jobs")
             
-            # Step 3: Retrieve job details from MongoDB
-            jobs = []
-            for job_id in job_ids:
-                job = self.mongo_handler.get_job_by_id(job_id)
-                if job:
-                    jobs.append(job)
-                else:
-                    self.logger.warning(f"Job with ID {job_id} not found in MongoDB")
+            # Step 3: Retrieve job details from MongoDB in one query (only for hits without a full card)
+            known = {card["_id"]: card for card in cards or [] if "job_title" in card}
+            fetched, missing = self.mongo_handler.get_jobs_by_ids(
+                [job_id for job_id in job_ids if job_id not in known], projection=self.JOB_FIELDS
+            )
+            known.update((job["_id"], job) for job in fetched)
+            if missing:
+                self.logger.warning(f"{len(missing)} recommended jobs not found in MongoDB: {missing}")
+            
+            # Keep each score with its job when some hits are dropped
+            jobs = [known[job_id] for job_id in job_ids if job_id in known]
+            score = [job_score for job_id, job_score in zip(job_ids, score) if job_id in known]
             
-            self.logger.info(f"Retrieved {len(jobs)} job details from MongoDB")
+            self.logger.info(f"Retrieved {len(jobs)} job details")
             
             return {
                 "success": True,
@@ -68,4 +130,77 @@ class RecommendationsPipeline:
             import traceback
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return {"success": False, "error": str(e)}
-    
\ No newline at end of file
+        
+    def search_jobs_batch(self,
+                          resumes: List[Union[str, dict]],
+                          limit: int = 10,
+                          filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Rank jobs for many resumes at once: one batched embedding call, batched vector searches,
+        # and each matched job fetched from MongoDB once however many resumes it matched.
+        # "results" holds one search_jobs_pipeline-style entry per resume, in input order.
+        try:
+            self.logger.info(f"Starting batch job search for {len(resumes)} resumes")
+            
+            valid_rows = [row for row, resume in enumerate(resumes)
+                          if (isinstance(resume, str) and resume.strip()) or (isinstance(resume, dict) and resume)]
+            results = [{"success": False, "error": "Resume is empty"} for _ in resumes]
+            if not valid_rows:
+                return {"success": False, "error": "No valid resumes provided", "results": results}
+            
+            # Step 1: Generate all resume embeddings in one batched call
+            resume_embeddings = self.embedding_handler.get_resume_embeddings([resumes[row] for row in valid_rows])
+            
+            # Step 2: Batched vector search
+            query_texts = None
+            if self.vector_handler.sparse_vectors:
+                query_texts = [self.embedding_handler.get_resume_text(resumes[row]) for row in valid_rows]
+            card_mode = self.vector_handler.payload_policy == "card"
+            if card_mode:
+                searches = self.vector_handler.search_job_cards_batch(resume_embeddings, limit=limit, filters=filters,
+                                                                      query_texts=query_texts)
+            else:
+                searches = self.vector_handler.search_similar_jobs_batch(resume_embeddings, limit=limit, filters=filters,
+                                                                         query_texts=query_texts)
+            
+            if len(searches) != len(valid_rows):
+                self.logger.error("Batch vector search failed")
+                return {"success": False, "error": "Batch vector search failed", "results": results}
+            
+            # Step 3: Retrieve each distinct job once, in a single MongoDB query
+            job_cache = {}
+            to_fetch = []
+            for hits, _ in searches:
+                for hit in hits:
+                    if card_mode and "job_title" in hit:
+                        job_cache.setdefault(hit["_id"], hit)
+                    else:
+                        to_fetch.append(hit["_id"] if card_mode else hit)
+            fetched, missing = self.mongo_handler.get_jobs_by_ids(
+                [job_id for job_id in dict.fromkeys(to_fetch) if job_id not in job_cache], projection=self.JOB_FIELDS
+            )
+            job_cache.update((job["_id"], job) for job in fetched)
+            if missing:
+                self.logger.warning(f"{len(missing)} recommended jobs not found in MongoDB")
+            
+            for row, (hits, hit_scores) in zip(valid_rows, searches):
+                jobs, scores = [], []
+                for hit, score in zip(hits, hit_scores):
+                    job = job_cache.get(hit["_id"] if card_mode else hit)
+                    if job:
+                        jobs.append(job)
+                        scores.append(score)
+                results[row] = {"success": True, "jobs": jobs, "scores": scores, "count": len(jobs)}
+            
+            self.logger.info(f"Batch search matched {len(job_cache)} distinct jobs for {len(valid_rows)} resumes")
+            
+            return {
+                "success": True,
+                "results": results,
+                "count": len(valid_rows)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in batch job search: {e}")
+            import traceback
+            self.logger.error(f"Traceback: {traceback.format_exc()}")
+            return {"success": False, "error": str(e)}
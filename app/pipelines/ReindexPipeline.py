@@ -0,0 +1,188 @@
+from data.mongodb.MongoClient import MongoDBHandler
+from data.embeddings.EmbeddingHandler import EmbeddingHandler
+from data.vectordb.QdrantClient import QdrantHandler
+from typing import Dict, Any, List, Optional
+import streamlit as st
+import logging
+import json
+import time
+import os
+
+
+class ReindexPipeline:
+    # Blue/green rebuild of the job vectors, e.g. after changing HF_MODEL or the job text template.
+    # Jobs are streamed from MongoDB into a new versioned collection ("jobs_v<timestamp>") while the
+    # live alias (QDRANT_COLLECTION, default "jobs") keeps serving searches from the current one.
+    # Points for jobs deleted meanwhile are then dropped from the new collection, and once its point
+    # count matches MongoDB the alias is switched atomically. Progress is checkpointed after every
+    # batch, so an interrupted run resumes where it stopped instead of starting over.
+
+    def __init__(self, alias_name: Optional[str] = None, checkpoint_dir: Optional[str] = None):
+        self.mongo_handler = MongoDBHandler()
+        self.embedding_handler = EmbeddingHandler()
+        self.live_handler = QdrantHandler(collection_name=alias_name)
+        self.alias_name = self.live_handler.collection_name
+
+        self.checkpoint_dir = checkpoint_dir or os.getenv("REINDEX_CHECKPOINT_DIR") or st.secrets.get("REINDEX_CHECKPOINT_DIR") or ".cache/reindex"
+        self.batch_size = int(os.getenv("REINDEX_BATCH_SIZE") or st.secrets.get("REINDEX_BATCH_SIZE") or 128)
+        # Pause between batches so reindexing leaves embedding / Qdrant capacity for live recommendations
+        self.batch_pause = float(os.getenv("REINDEX_BATCH_PAUSE") or st.secrets.get("REINDEX_BATCH_PAUSE") or 0.5)
+
+        # Set up logging
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.checkpoint_dir, f"{self.alias_name}.json")
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _embed_batch(self, jobs: List[Dict[str, Any]], target: QdrantHandler):
+        # Returns (jobs, embeddings, section_embeddings) for the jobs that could be embedded
+        try:
+            embeddings = self.embedding_handler.get_job_embeddings(jobs)
+            if len(embeddings) != len(jobs):
+                raise ValueError(f"Expected {len(jobs)} embeddings, got {len(embeddings)}")
+            embedded_jobs, rows = jobs, list(embeddings)
+        except Exception as e:
+            # Some jobs have no usable text; embed one by one so a single bad job doesn't sink the batch
+            self.logger.warning(f"Batch embedding failed ({e}); embedding jobs individually")
+            embedded_jobs, rows = [], []
+            for job in jobs:
+                try:
+                    rows.append(self.embedding_handler.get_job_embeddings([job])[0])
+                    embedded_jobs.append(job)
+                except Exception as job_error:
+                    self.logger.error(f"Skipping job {job['_id']}: {job_error}")
+
+        sections = None
+        if target.named_vectors and embedded_jobs:
+            matrices = self.embedding_handler.get_job_section_embeddings(embedded_jobs)
+            sections = [{name: matrix[i] for name, matrix in matrices.items()} for i in range(len(embedded_jobs))]
+        return embedded_jobs, rows, sections
+
+    def _reconcile(self, target: QdrantHandler) -> int:
+        # Drop points whose job is no longer in MongoDB (deleted after it was streamed); returns how many
+        removed = 0
+        for job_ids in target.iter_job_ids(self.batch_size):
+            _, missing = self.mongo_handler.get_jobs_by_ids(job_ids, projection=["_id"])
+            if missing:
+                if not target.delete_job_vectors(missing):
+                    raise RuntimeError(f"Failed to remove {len(missing)} deleted jobs from {target.collection_name}")
+                removed += len(missing)
+        if removed:
+            self.logger.info(f"Removed {removed} jobs deleted during the reindex from {target.collection_name}")
+        return removed
+
+    def reindex_pipeline(self, resume: bool = True, drop_old: bool = False, replace_plain: bool = False) -> Dict[str, Any]:
+        # replace_plain: allow replacing a plain (pre-alias) live collection, see QdrantHandler.switch_alias
+        try:
+            checkpoint = self._load_checkpoint() if resume else None
+            if checkpoint:
+                self.logger.info(f"Resuming reindex into {checkpoint['collection']} after job {checkpoint['last_id']}")
+            else:
+                checkpoint = {
+                    "collection": f"{self.alias_name}_v{int(time.time())}",
+                    "last_id": None,
+                    "indexed": 0,
+                    "skipped": 0,
+                    "skipped_ids": [],
+                }
+                self._save_checkpoint(checkpoint)
+                self.logger.info(f"Starting reindex into {checkpoint['collection']}")
+
+            # Step 1: Create (or reopen) the target collection with the current configuration
+            target = QdrantHandler(collection_name=checkpoint["collection"], create_alias=False)
+            if not target.is_connected():
+                return {"success": False, "error": "Could not connect to Qdrant"}
+            target.upsert_parallel = 1
+
+            # Step 2: Stream MongoDB in _id order. Jobs inserted meanwhile sort after the cursor and are
+            # picked up by the same loop, so the stream ends only once it has caught up.
+            for jobs in self.mongo_handler.iter_job_batches(self.batch_size, after_id=checkpoint["last_id"]):
+                embedded_jobs, embeddings, sections = self._embed_batch(jobs, target)
+                if embedded_jobs:
+                    statuses = target.store_job_vectors(
+                        jobs=embedded_jobs,
+                        embeddings=embeddings,
+                        job_ids=[job["_id"] for job in embedded_jobs],
+                        section_embeddings=sections,
+                        wait=True
+                    )
+                    failed = [job_id for job_id, stored in statuses.items() if not stored]
+                    if failed:
+                        # Stop without advancing the checkpoint; the next run retries this batch
+                        return {"success": False, "error": f"Failed to store {len(failed)} vectors", **checkpoint}
+
+                checkpoint["last_id"] = jobs[-1]["_id"]
+                checkpoint["indexed"] += len(embedded_jobs)
+                checkpoint["skipped"] += len(jobs) - len(embedded_jobs)
+                embedded_ids = {job["_id"] for job in embedded_jobs}
+                checkpoint.setdefault("skipped_ids", []).extend(job["_id"] for job in jobs if job["_id"] not in embedded_ids)
+                self._save_checkpoint(checkpoint)
+                self.logger.info(f"Reindexed {checkpoint['indexed']} jobs ({checkpoint['skipped']} skipped)")
+
+                if self.batch_pause:
+                    time.sleep(self.batch_pause)
+
+            # Step 3: Reconcile deletes made during the run, then verify before switching.
+            # Skipped jobs that have since been deleted no longer count against the total.
+            self._reconcile(target)
+            skipped_existing, _ = self.mongo_handler.get_jobs_by_ids(checkpoint.get("skipped_ids", []), projection=["_id"])
+            expected = self.mongo_handler.get_jobs_count() - len(skipped_existing)
+            stored = target.count_points()
+            if stored != expected:
+                self.logger.error(f"Count mismatch in {target.collection_name}: {stored} points, expected {expected}")
+                return {"success": False, "error": f"Count mismatch: {stored} points, expected {expected}",
+                        "expected": expected, "stored": stored, **checkpoint}
+
+            # Step 4: Atomic alias switch
+            previous = self.live_handler.switch_alias(target.collection_name, replace_plain=replace_plain)
+            self._clear_checkpoint()
+
+            if drop_old and previous:
+                target.client.delete_collection(previous)
+                self.logger.info(f"Dropped previous collection {previous}")
+
+            result = {
+                "success": True,
+                "collection": target.collection_name,
+                "previous_collection": previous,
+                "indexed": checkpoint["indexed"],
+                "skipped": checkpoint["skipped"],
+            }
+            self.logger.info(f"Reindex completed: {result}")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Error in reindex pipeline: {e}")
+            import traceback
+            self.logger.error(f"Traceback: {traceback.format_exc()}")
+            return {"success": False, "error": str(e)}
+
+
+if __name__ == "__main__":
+    # Run from the app directory: python -m pipelines.ReindexPipeline [--restart] [--drop-old] [--replace-plain]
+    import sys
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    print(ReindexPipeline().reindex_pipeline(resume="--restart" not in sys.argv, drop_old="--drop-old" in sys.argv,
+                                             replace_plain="--replace-plain" in sys.argv))
@@ -33,7 +33,8 @@ class jobHandler:
             except Exception as e:
                 st.warning(f"Attempt {attempt + 1} failed: {str(e)}")
                 if attempt < max_retries - 1:
-                    time.sleep(1)  # Wait a bit before retry
+                    # Exponential backoff with jitter from the shared Groq rate controller
+                    time.sleep(self.llm_processor.rate_controller.backoff_delay(attempt, e))
                     continue
                 else:
                     st.error(f"{job_num} Job generations failed for {job_domains} after multiple retries.")
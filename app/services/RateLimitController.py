@@ -0,0 +1,209 @@
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+class AdaptiveRateController:
+    # Shared, per-provider concurrency controller for remote model calls.
+    # - Concurrency follows AIMD: +1 slot per window of successes, halved on 429/503.
+    # - Retry-After / rate-limit reset headers pause every caller of the provider, not just the one that was throttled.
+    # - Other retries use exponential backoff with full jitter so callers don't retry in lockstep.
+
+    _instances: Dict[str, "AdaptiveRateController"] = {}
+    _instances_lock = threading.Lock()
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self,
+                 name: str,
+                 initial_limit: int = 4,
+                 min_limit: int = 1,
+                 max_limit: int = 32,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(__name__)
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        self.successes = 0
+        self.throttles = 0
+        self.errors = 0
+
+    @classmethod
+    def for_provider(cls, name: str, **kwargs) -> "AdaptiveRateController":
+        # One controller per provider per process, shared by every handler/session
+        with cls._instances_lock:
+            if name not in cls._instances:
+                cls._instances[name] = cls(name, **kwargs)
+            return cls._instances[name]
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    # --- slot management -------------------------------------------------
+
+    def _try_acquire(self) -> float:
+        # Returns 0 when a slot was taken, otherwise how long the caller should wait before trying again
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return 0.0
+        return 0.05
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    return
+                self._cond.wait(timeout=wait)
+
+    def release(self):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify()
+
+    async def aacquire(self):
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(min(wait, 1.0))
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # --- feedback --------------------------------------------------------
+
+    def on_success(self):
+        with self._cond:
+            self.successes += 1
+            # Additive increase: roughly one extra slot per `limit` successful calls
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+            self._cond.notify_all()
+
+    def on_error(self, error: BaseException) -> bool:
+        # Record a failed call. Returns True when the provider throttled us.
+        status = self.status_code(error)
+        if status not in self.THROTTLE_STATUSES:
+            with self._cond:
+                self.errors += 1
+            return False
+
+        retry_after = self.retry_after(error)
+        with self._cond:
+            self.throttles += 1
+            now = time.monotonic()
+            # Several in-flight calls usually hit the same limit; cut only once per short window
+            if now - self._last_decrease > 1.0:
+                self._limit = max(float(self.min_limit), self._limit / 2.0)
+                self._last_decrease = now
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + min(retry_after, self.max_delay))
+        self.logger.warning(f"{self.name} throttled (HTTP {status}), concurrency limit now {self.limit}"
+                            + (f", pausing {retry_after:.1f}s" if retry_after else ""))
+        return True
+
+    def backoff_delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        retry_after = self.retry_after(error) if error is not None else None
+        if retry_after:
+            return min(retry_after, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    # --- header parsing --------------------------------------------------
+
+    @staticmethod
+    def _response(error: BaseException) -> Any:
+        return getattr(error, "response", None)
+
+    @classmethod
+    def status_code(cls, error: BaseException) -> Optional[int]:
+        response = cls._response(error)
+        status = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+        try:
+            return int(status) if status is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def retry_after(cls, error: BaseException) -> Optional[float]:
+        response = cls._response(error)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            headers = {str(k).lower(): str(v) for k, v in dict(headers).items()}
+        except (TypeError, ValueError):
+            return None
+
+        if "retry-after" in headers:
+            value = headers["retry-after"].strip()
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+        # Provider-specific reset hints, e.g. Groq "x-ratelimit-reset-requests: 2m59.56s"
+        for key in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens", "x-ratelimit-reset", "ratelimit-reset"):
+            if key in headers:
+                seconds = cls._parse_duration(headers[key])
+                if seconds is not None:
+                    return seconds
+        return None
+
+    @staticmethod
+    def _parse_duration(value: str) -> Optional[float]:
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+        if not parts:
+            return None
+        scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+        return sum(float(number) * scale[unit] for number, unit in parts)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "successes": self.successes,
+                "throttles": self.throttles,
+                "errors": self.errors,
+                "paused_for": max(0.0, self._blocked_until - time.monotonic()),
+            }
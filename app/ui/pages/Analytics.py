@@ -6,6 +6,9 @@ from data.mongodb.MongoClient import MongoDBHandler
 import logging
 
 class AnalyticsPage:
+    RECENT_JOB_FIELDS = ["job_title", "company", "location", "job_domain", "experience_level",
+                         "employment_type", "created_at"]
+
     def __init__(self):
         self.mongo_handler = MongoDBHandler()
         
@@ -16,158 +19,121 @@ class AnalyticsPage:
             
             # Get data from MongoDB
             try:
-                jobs_data = self.mongo_handler.get_all_jobs()
+                # Counts are aggregated in MongoDB; only the summary comes back
+                summary = self.mongo_handler.get_analytics_summary()
                 
-                if not jobs_data:
+                if not summary or not summary["total_jobs"]:
                     st.info("No job data available for analytics. Please add some job descriptions first.")
                     return
                 
-                # Convert to DataFrame
-                df = pd.DataFrame(jobs_data)
-                
                 # Display key metrics
-                self._display_key_metrics(df)
+                self._display_key_metrics(summary)
                 
                 st.markdown("---")
                 
                 # Display charts
-                self._display_charts(df, jobs_data)
+                self._display_charts(summary)
                 
                 # Display recent jobs table
-                self._display_recent_jobs(df)
+                recent_jobs, _ = self.mongo_handler.list_jobs(page_size=5, projection=self.RECENT_JOB_FIELDS)
+                self._display_recent_jobs(pd.DataFrame(recent_jobs))
                 
             except Exception as e:
                 st.error(f"Error loading analytics data: {e}")
                 logging.error(f"Analytics page error: {e}")
     
-    def _display_key_metrics(self, df):
+    def _display_key_metrics(self, summary):
         """Display key metrics in columns"""
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Jobs", len(df))
+            st.metric("Total Jobs", summary["total_jobs"])
         
         with col2:
-            companies_count = df['company'].nunique() if 'company' in df.columns else 0
-            st.metric("Companies", companies_count)
+            st.metric("Companies", summary["companies"])
         
         with col3:
-            locations_count = df['location'].nunique() if 'location' in df.columns else 0
-            st.metric("Locations", locations_count)
+            st.metric("Locations", summary["locations"])
         
         with col4:
-            # Use job_domain instead of department
-            domains_count = df['job_domain'].nunique() if 'job_domain' in df.columns else 0
-            st.metric("Job Domains", domains_count)
+            st.metric("Job Domains", summary["domains"])
     
-    def _display_charts(self, df, jobs_data):
+    def _display_charts(self, summary):
         """Display various analytics charts"""
         col1, col2 = st.columns(2)
         
         with col1:
-            self._display_domain_chart(df)
+            self._display_domain_chart(summary["by_domain"])
         
         with col2:
-            self._display_experience_chart(df)
+            self._display_experience_chart(summary["by_experience"])
         
         # Location analysis
-        self._display_location_chart(df)
+        self._display_location_chart(summary["top_locations"])
         
         # Skills analysis
-        self._display_skills_chart(jobs_data)
+        self._display_skills_chart(summary["top_skills"])
     
-    def _display_domain_chart(self, df):
+    def _display_domain_chart(self, domain_counts):
         """Display jobs by domain pie chart"""
         st.subheader("Jobs by Domain")
         
-        if 'job_domain' in df.columns and not df['job_domain'].isna().all():
-            domain_counts = df['job_domain'].value_counts()
-            if not domain_counts.empty:
-                fig_domain = px.pie(
-                    values=domain_counts.values,
-                    names=domain_counts.index,
-                    title="Distribution of Jobs by Domain"
-                )
-                st.plotly_chart(fig_domain, use_container_width=True)
-            else:
-                st.info("No domain data available")
+        if domain_counts:
+            fig_domain = px.pie(
+                values=list(domain_counts.values()),
+                names=list(domain_counts.keys()),
+                title="Distribution of Jobs by Domain"
+            )
+            st.plotly_chart(fig_domain, use_container_width=True)
         else:
             st.info("No domain data available")
     
-    def _display_experience_chart(self, df):
+    def _display_experience_chart(self, exp_counts):
         """Display jobs by experience level bar chart"""
         st.subheader("Jobs by Experience Level")
         
-        if 'experience_level' in df.columns and not df['experience_level'].isna().all():
-            exp_counts = df['experience_level'].value_counts()
-            if not exp_counts.empty:
-                fig_exp = px.bar(
-                    x=exp_counts.index,
-                    y=exp_counts.values,
-                    title="Jobs by Experience Level",
-                    labels={'x': 'Experience Level', 'y': 'Number of Jobs'}
-                )
-                st.plotly_chart(fig_exp, use_container_width=True)
-            else:
-                st.info("No experience level data available")
+        if exp_counts:
+            fig_exp = px.bar(
+                x=list(exp_counts.keys()),
+                y=list(exp_counts.values()),
+                title="Jobs by Experience Level",
+                labels={'x': 'Experience Level', 'y': 'Number of Jobs'}
+            )
+            st.plotly_chart(fig_exp, use_container_width=True)
         else:
             st.info("No experience level data available")
     
-    def _display_location_chart(self, df):
+    def _display_location_chart(self, location_counts):
         """Display top locations horizontal bar chart"""
         st.subheader("Top Locations")
         
-        if 'location' in df.columns and not df['location'].isna().all():
-            location_counts = df['location'].value_counts().head(10)
-            if not location_counts.empty:
-                fig_loc = px.bar(
-                    x=location_counts.values,
-                    y=location_counts.index,
-                    orientation='h',
-                    title="Top 10 Job Locations",
-                    labels={'x': 'Number of Jobs', 'y': 'Location'}
-                )
-                st.plotly_chart(fig_loc, use_container_width=True)
-            else:
-                st.info("No location data available")
+        if location_counts:
+            fig_loc = px.bar(
+                x=list(location_counts.values()),
+                y=list(location_counts.keys()),
+                orientation='h',
+                title="Top 10 Job Locations",
+                labels={'x': 'Number of Jobs', 'y': 'Location'}
+            )
+            st.plotly_chart(fig_loc, use_container_width=True)
         else:
             st.info("No location data available")
     
-    def _display_skills_chart(self, jobs_data):
+    def _display_skills_chart(self, skill_counts):
         """Display most in-demand skills chart"""
         st.subheader("Most In-Demand Skills")
         
-        try:
-            all_skills = []
-            
-            # Extract skills from all jobs using the correct field name
-            for job in jobs_data:
-                if 'required_skills' in job and job['required_skills']:
-                    if isinstance(job['required_skills'], list):
-                        all_skills.extend(job['required_skills'])
-                    elif isinstance(job['required_skills'], str):
-                        # Split string by common separators
-                        skills = job['required_skills'].replace(',', '\n').replace(';', '\n').split('\n')
-                        all_skills.extend([skill.strip() for skill in skills if skill.strip()])
-            
-            if all_skills:
-                skills_df = pd.DataFrame(all_skills, columns=['skill'])
-                skill_counts = skills_df['skill'].value_counts().head(10)
-                
-                fig_skills = px.bar(
-                    x=skill_counts.values,
-                    y=skill_counts.index,
-                    orientation='h',
-                    title="Top 10 Most Required Skills",
-                    labels={'x': 'Frequency', 'y': 'Skill'}
-                )
-                st.plotly_chart(fig_skills, use_container_width=True)
-            else:
-                st.info("No skills data available")
-                
-        except Exception as e:
+        if skill_counts:
+            fig_skills = px.bar(
+                x=list(skill_counts.values()),
+                y=list(skill_counts.keys()),
+                orientation='h',
+                title="Top 10 Most Required Skills",
+                labels={'x': 'Frequency', 'y': 'Skill'}
+            )
+            st.plotly_chart(fig_skills, use_container_width=True)
+        else:
             st.info("No skills data available")
-            logging.error(f"Error processing skills data: {e}")
     
     def _display_recent_jobs(self, df):
         """Display recent jobs table"""
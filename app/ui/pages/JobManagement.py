@@ -9,6 +9,7 @@ class JobManagementPage:
     def __init__ (self):
         self.job_handler = jobHandler()
         self.mongo_handler = MongoDBHandler()
+        self.page_size = 20
             
     def render(self):
         # JOB MANAGEMENT PAGE
@@ -118,17 +119,23 @@ class JobManagementPage:
             with tab3:
                 st.write("View all Jobs")
 
-                jobs_to_display = self.mongo_handler.get_all_jobs()
+                total_jobs = self.mongo_handler.get_jobs_count()
 
-                if jobs_to_display:
+                if total_jobs:
                     # Search and filter
                     search_term = st.text_input("🔍 Search jobs...", placeholder="Enter job title, company, or skill")
 
-                    filtered_jobs = jobs_to_display
                     if search_term:
                         filtered_jobs = self.mongo_handler.search_jobs(search_term)
-
-                    st.write(f"Showing {len(filtered_jobs)} of {len(jobs_to_display)} jobs")
+                        st.write(f"Showing {len(filtered_jobs)} of {total_jobs} jobs")
+                    else:
+                        # One page at a time; the cursor stack lets "Previous" go back without re-scanning
+                        page_cursors = st.session_state.setdefault("job_page_cursors", [None])
+                        filtered_jobs, next_cursor = self.mongo_handler.list_jobs(
+                            page_size=self.page_size, after=page_cursors[-1]
+                        )
+                        first = (len(page_cursors) - 1) * self.page_size
+                        st.write(f"Showing {first + 1}–{first + len(filtered_jobs)} of {total_jobs} jobs")
 
                     # Display jobs
                     for job in filtered_jobs:
@@ -180,5 +187,16 @@ class JobManagementPage:
 
                             st.write("**Description:**")
                             st.write(job['summary'])
+
+                    if not search_term:
+                        prev_col, next_col = st.columns(2)
+                        with prev_col:
+                            if st.button("⬅️ Previous", key="jobs_prev_page", disabled=len(page_cursors) == 1):
+                                page_cursors.pop()
+                                st.rerun()
+                        with next_col:
+                            if st.button("Next ➡️", key="jobs_next_page", disabled=next_cursor is None):
+                                page_cursors.append(next_cursor)
+                                st.rerun()
                 else:
                     st.info("No jobs found. Generate or Create some jobs first!")
@@ -43,6 +43,15 @@ class RecommendationsPage:
                 with col1:
                     limit = st.slider("Number of job recommendations", min_value=1, max_value=20, value=5, step=1)
 
+                    # Diversity re-ranking is opt-in: it over-fetches candidates with their vectors
+                    mmr_lambda, max_per_company = None, None
+                    with st.expander("Diversity options"):
+                        if st.checkbox("Diversify results", value=False, key="diversify_results"):
+                            mmr_lambda = st.slider("Relevance vs. diversity (1.0 = relevance only)",
+                                                   min_value=0.0, max_value=1.0, value=0.7, step=0.05)
+                            max_per_company = st.number_input("Max jobs per company (0 = no cap)",
+                                                              min_value=0, max_value=20, value=2, step=1) or None
+
                 with col2:
                     
                     # --- GET RECOMMENDATIONS BUTTON ---
@@ -56,7 +65,9 @@ class RecommendationsPage:
                             
                             recommendations = self.pipeline.search_jobs_pipeline(
                                 resume_text=resume,
-                                limit=limit
+                                limit=limit,
+                                mmr_lambda=mmr_lambda,
+                                max_per_company=max_per_company
                             )
                         
                 st.markdown("---")